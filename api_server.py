@@ -3,14 +3,19 @@ Flask API server: options from data.csv (or output_multi_ticker.csv), stock hist
 Run: python api_server.py   (default: http://localhost:5000)
 Set CSV_PATH below to use data.csv or output_multi_ticker.csv.
 """
-import csv
 import logging
 import os
 
+import numpy as np
 import pandas as pd
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from market_data import get_history, get_quote
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
@@ -22,56 +27,115 @@ CORS(app, origins=["http://localhost:5173", "http://localhost:5174", "http://127
 # Path to multi-ticker output CSV (project root)
 CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data.csv")
 
-# In-memory cache: ticker -> list of row dicts
+# In-memory cache: ticker -> list of option dicts, already formatted for the API
 _options_by_ticker: dict[str, list[dict]] = {}
+# ticker -> pre-serialized {"options": [...]} body (only when orjson is installed)
+_json_cache: dict[str, bytes] = {}
+
+
+def ojsonify(obj) -> Response:
+    """JSON response serialized with orjson (falls back to flask.jsonify)."""
+    if orjson is None:
+        return jsonify(obj)
+    return Response(orjson.dumps(obj), mimetype="application/json")
+
 
+def _text_col(df: pd.DataFrame, col: str) -> pd.Series:
+    """String column from the CSV frame, or empty strings if the column is missing."""
+    return df[col] if col in df.columns else pd.Series("", index=df.index, dtype=object)
 
-def _option_type_from_contract(symbol: str) -> str:
-    """Infer call vs put from contract symbol (e.g. ...C00700000 = call, ...P00667000 = put)."""
-    if not symbol:
-        return "call"
-    s = str(symbol).upper()
-    return "call" if "C0" in s else "put"
+
+def _float_or(val, default: float = 0) -> float:
+    try:
+        return float(val) if val != "" else default
+    except (TypeError, ValueError):
+        return default
 
 
-def _score_to_confidence(score: float) -> int:
-    """Map opportunity score (roughly -100..100) to confidence 0-100."""
+def _numeric_col(col: pd.Series) -> pd.Series:
+    """
+    Parse a string column with float() semantics; empty or unparseable values become 0.
+    pd.to_numeric is not correctly rounded (e.g. "0.115" can land an ulp off), which
+    would change rounded prices.
+    """
+    empty = col == ""
     try:
-        v = float(score)
-        c = 50 + v / 2
-        return max(0, min(100, int(round(c))))
+        vals = col.where(~empty, "0").astype(float)
     except (TypeError, ValueError):
-        return 50
+        return pd.Series([_float_or(v, 0.0) for v in col.tolist()], index=col.index, dtype=float)
+    return vals.where(~empty, 0.0)
+
+
+def _round_list(col: pd.Series, ndigits: int) -> list[float]:
+    """
+    Python round() per value. np.round differs from round() on ties such as 0.645,
+    which would change the numbers the API has always returned.
+    """
+    return [round(v, ndigits) for v in col.tolist()]
+
+
+def _confidence(score: np.ndarray) -> np.ndarray:
+    """clip(round(50 + score/2), 0, 100); 50 for a NaN score."""
+    with np.errstate(invalid="ignore"):
+        conf = np.clip(np.rint(50 + score / 2), 0, 100)
+    return np.where(np.isnan(conf), 50, conf).astype(int)
+
+
+def _format_options(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Build the API option columns for every CSV row at once:
+    type inferred from the contract symbol (...C0... = call, empty = call),
+    confidence = clip(round(50 + score/2), 0, 100).
+    """
+    symbol = _text_col(df, "contractSymbol")
+    mid = _text_col(df, "midPrice")
+    mid = mid.where(mid != "", _text_col(df, "price"))
+    score = _numeric_col(_text_col(df, "score"))
+    is_call = (symbol == "") | symbol.str.upper().str.contains("C0", regex=False)
+    return pd.DataFrame({
+        "ticker": df["ticker"],
+        "type": np.where(is_call, "call", "put"),
+        "expiration": _text_col(df, "expiration").str.strip(),
+        "contractSymbol": symbol.str.strip(),
+        "strike": _round_list(_numeric_col(_text_col(df, "strike")), 2),
+        "price": _round_list(_numeric_col(_text_col(df, "price")), 2),
+        "bid": _round_list(_numeric_col(_text_col(df, "bid")), 2),
+        "midPrice": _round_list(_numeric_col(mid), 2),
+        "score": _round_list(score, 2),
+        "impliedVolatility": _round_list(_numeric_col(_text_col(df, "impliedVolatility")), 4),
+        "confidence": _confidence(score.to_numpy()),
+    }, index=df.index)
 
 
 def load_csv() -> None:
-    """Load CSV (data.csv or output_multi_ticker.csv) and index by ticker."""
-    global _options_by_ticker
+    """
+    Load CSV (data.csv or output_multi_ticker.csv), format every row once, and
+    index by ticker. Each ticker's response body is also serialized up front.
+    """
+    global _options_by_ticker, _json_cache
     _options_by_ticker = {}
+    _json_cache = {}
     if not os.path.isfile(CSV_PATH):
         logger.warning("CSV not found: %s", CSV_PATH)
         return
     try:
-        with open(CSV_PATH, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                ticker = (row.get("ticker") or "").strip().upper()
-                if not ticker:
-                    continue
-                _options_by_ticker.setdefault(ticker, []).append(row)
+        df = pd.read_csv(CSV_PATH, dtype=str, keep_default_na=False, encoding="utf-8")
+        if "ticker" not in df.columns:
+            logger.warning("CSV has no ticker column: %s", CSV_PATH)
+            return
+        df["ticker"] = df["ticker"].str.strip().str.upper()
+        df = df[df["ticker"] != ""]
+        formatted = _format_options(df)
+        by_ticker = {t: g.to_dict("records") for t, g in formatted.groupby("ticker", sort=False)}
+        if orjson is not None:
+            _json_cache = {t: orjson.dumps({"options": opts}) for t, opts in by_ticker.items()}
+        _options_by_ticker = by_ticker
         logger.info("Loaded %d tickers, %d total options from %s",
                     len(_options_by_ticker), sum(len(v) for v in _options_by_ticker.values()), CSV_PATH)
     except Exception as e:
         logger.exception("Failed to load CSV: %s", e)
 
 
-def _float_or(val, default: float = 0) -> float:
-    try:
-        return float(val) if val != "" else default
-    except (TypeError, ValueError):
-        return default
-
-
 @app.route("/api/stocks/<ticker>/options", methods=["GET"])
 def get_stock_options(ticker: str):
     """
@@ -81,42 +145,17 @@ def get_stock_options(ticker: str):
     """
     ticker = ticker.strip().upper()
     if not ticker:
-        return jsonify({"error": "Ticker required"}), 400
-    rows = _options_by_ticker.get(ticker, [])
-    options = []
-    for row in rows:
-        try:
-            strike = _float_or(row.get("strike"), 0)
-            price = _float_or(row.get("price"), 0)
-            bid = _float_or(row.get("bid"), 0)
-            mid = row.get("midPrice") or row.get("price") or 0
-            mid = _float_or(mid, 0)
-            score = _float_or(row.get("score"), 0)
-            iv = _float_or(row.get("impliedVolatility"), 0)
-            opt_type = _option_type_from_contract(row.get("contractSymbol", ""))
-            confidence = _score_to_confidence(score)
-            options.append({
-                "ticker": row.get("ticker", ticker).strip().upper(),
-                "type": opt_type,
-                "expiration": (row.get("expiration") or "").strip(),
-                "contractSymbol": (row.get("contractSymbol") or "").strip(),
-                "strike": round(strike, 2),
-                "price": round(price, 2),
-                "bid": round(bid, 2),
-                "midPrice": round(mid, 2),
-                "score": round(score, 2),
-                "impliedVolatility": round(iv, 4),
-                "confidence": confidence,
-            })
-        except (TypeError, ValueError):
-            continue
-    return jsonify({"options": options})
+        return ojsonify({"error": "Ticker required"}), 400
+    body = _json_cache.get(ticker)
+    if body is not None:
+        return Response(body, mimetype="application/json")
+    return ojsonify({"options": _options_by_ticker.get(ticker, [])})
 
 
 @app.route("/api/tickers", methods=["GET"])
 def get_tickers():
     """Return list of tickers we have options data for (from the loaded CSV)."""
-    return jsonify({"tickers": sorted(_options_by_ticker.keys())})
+    return ojsonify({"tickers": sorted(_options_by_ticker.keys())})
 
 
 @app.route("/api/stocks/<ticker>/history", methods=["GET"])
@@ -128,12 +167,12 @@ def get_stock_history(ticker: str):
     """
     ticker = ticker.strip().upper()
     if not ticker:
-        return jsonify({"error": "Ticker required"}), 400
+        return ojsonify({"error": "Ticker required"}), 400
     period = request.args.get("period", "1mo").strip() or "1mo"
     try:
         df = get_history(ticker, period=period)
         if df is None or df.empty:
-            return jsonify({"prices": [], "ohlc": []})
+            return ojsonify({"prices": [], "ohlc": []})
         df = df.reset_index()
         date_col = "Date" if "Date" in df.columns else (df.columns[0] if len(df.columns) else None)
         if date_col is not None:
@@ -155,10 +194,10 @@ def get_stock_history(ticker: str):
                 continue
             prices.append({"date": d, "price": round(close, 2)})
             ohlc.append({"date": d, "open": round(open_, 2), "high": round(high, 2), "low": round(low, 2), "close": round(close, 2)})
-        return jsonify({"prices": prices, "ohlc": ohlc})
+        return ojsonify({"prices": prices, "ohlc": ohlc})
     except Exception as e:
         logger.exception("History failed for %s: %s", ticker, e)
-        return jsonify({"prices": [], "ohlc": []})
+        return ojsonify({"prices": [], "ohlc": []})
 
 
 @app.route("/api/stocks/<ticker>/quote", methods=["GET"])
@@ -166,20 +205,20 @@ def get_stock_quote(ticker: str):
     """Return current price and day change from Yahoo Finance. { currentPrice, dayChangePercent }"""
     ticker = ticker.strip().upper()
     if not ticker:
-        return jsonify({"error": "Ticker required"}), 400
+        return ojsonify({"error": "Ticker required"}), 400
     try:
         q = get_quote(ticker)
         if q is None:
-            return jsonify({"error": "Quote unavailable"}), 404
-        return jsonify(q)
+            return ojsonify({"error": "Quote unavailable"}), 404
+        return ojsonify(q)
     except Exception as e:
         logger.exception("Quote failed for %s: %s", ticker, e)
-        return jsonify({"error": "Quote failed"}), 500
+        return ojsonify({"error": "Quote failed"}), 500
 
 
 @app.route("/api/health", methods=["GET"])
 def health():
-    return jsonify({"status": "ok", "tickers_loaded": len(_options_by_ticker)})
+    return ojsonify({"status": "ok", "tickers_loaded": len(_options_by_ticker)})
 
 
 @app.before_request
@@ -5,10 +5,49 @@ import math
 from typing import Literal
 
 import numpy as np
-from scipy.stats import norm
+from scipy.special import ndtr
 
 OptionType = Literal["call", "put"]
 
+_INV_SQRT2 = 1.0 / math.sqrt(2.0)
+
+
+def _norm_cdf(x: float) -> float:
+    """Standard normal CDF for scalars via the C-level math.erfc (no NumPy/SciPy dispatch)."""
+    return 0.5 * math.erfc(-x * _INV_SQRT2)
+
+
+def bs_price_vec(
+    S: np.ndarray,
+    K: np.ndarray,
+    T: np.ndarray,
+    r: float,
+    sigma: np.ndarray,
+    is_call: np.ndarray,
+) -> np.ndarray:
+    """
+    Vectorized Black-Scholes price over NumPy arrays (inputs broadcast together).
+    is_call: boolean array, True for calls and False for puts.
+    Returns NaN where inputs are invalid (T<=0, sigma<=0, S<=0, K<=0).
+    """
+    S = np.asarray(S, dtype=float)
+    K = np.asarray(K, dtype=float)
+    T = np.asarray(T, dtype=float)
+    sigma = np.asarray(sigma, dtype=float)
+    is_call = np.asarray(is_call, dtype=bool)
+    valid = (T > 0) & (sigma > 0) & (S > 0) & (K > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sqrt_T = np.sqrt(T)
+        d1 = (np.log(S / K) + (r + 0.5 * sigma * sigma) * T) / (sigma * sqrt_T)
+        d2 = d1 - sigma * sqrt_T
+        disc = np.exp(-r * T)
+        price = np.where(
+            is_call,
+            S * ndtr(d1) - K * disc * ndtr(d2),
+            K * disc * ndtr(-d2) - S * ndtr(-d1),
+        )
+    return np.where(valid, price, np.nan)
+
 
 def bs_price(
     S: float,
@@ -22,16 +61,17 @@ def bs_price(
     Black-Scholes option price.
     S: spot, K: strike, T: time to expiry (years), r: risk-free rate, sigma: volatility.
     Returns NaN for invalid inputs (T<=0, sigma<=0, S<=0, K<=0).
+    Pure-Python scalar path; use bs_price_vec for arrays.
     """
-    if T <= 0 or sigma <= 0 or S <= 0 or K <= 0:
+    if not (T > 0 and sigma > 0 and S > 0 and K > 0):
         return float("nan")
     sqrt_T = math.sqrt(T)
     d1 = (math.log(S / K) + (r + 0.5 * sigma * sigma) * T) / (sigma * sqrt_T)
     d2 = d1 - sigma * sqrt_T
     if option_type == "call":
-        return float(S * norm.cdf(d1) - K * math.exp(-r * T) * norm.cdf(d2))
+        return float(S * _norm_cdf(d1) - K * math.exp(-r * T) * _norm_cdf(d2))
     else:
-        return float(K * math.exp(-r * T) * norm.cdf(-d2) - S * norm.cdf(-d1))
+        return float(K * math.exp(-r * T) * _norm_cdf(-d2) - S * _norm_cdf(-d1))
 
 
 def _self_test() -> None:
@@ -45,6 +85,12 @@ def _self_test() -> None:
     assert math.isnan(bs_price(100, 100, 0, 0.05, 0.2, "call"))
     assert math.isnan(bs_price(100, 100, 1, 0.05, 0, "call"))
     assert math.isnan(bs_price(0, 100, 1, 0.05, 0.2, "call"))
+    # Vectorized path agrees with the scalar path
+    vec = bs_price_vec(
+        np.array([100.0, 100.0]), np.array([100.0, 100.0]), np.array([1.0, 1.0]),
+        0.05, np.array([0.2, 0.2]), np.array([True, False]),
+    )
+    assert abs(vec[0] - c) < 1e-12 and abs(vec[1] - p) < 1e-12
 
 
 if __name__ == "__main__":
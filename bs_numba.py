@@ -0,0 +1,157 @@
+"""
+Numba-compiled Black-Scholes batch kernel.
+Falls back to the NumPy implementation in bs.py when numba is not installed.
+"""
+import logging
+import math
+import os
+import threading
+
+import numpy as np
+
+from bs import bs_price_vec
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numba
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+# The first parallel launch now usually happens on a worker thread (compute_scores
+# runs in thread pools). A TBB pool started off the main thread hangs interpreter
+# exit, so prefer OpenMP unless the user picked a threading layer.
+if NUMBA_AVAILABLE and not (
+    os.environ.get("NUMBA_THREADING_LAYER") or os.environ.get("NUMBA_THREADING_LAYER_PRIORITY")
+):
+    numba.config.THREADING_LAYER_PRIORITY = ["omp", "tbb", "workqueue"]
+
+# fastmath without the nnan/ninf flags: compute_scores passes NaN sigma for
+# contracts with unusable IV, and those must still come out as NaN.
+_FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+# Abramowitz & Stegun 26.2.17 coefficients (|error| < 7.5e-8)
+_P = 0.2316419
+_B1 = 0.319381530
+_B2 = -0.356563782
+_B3 = 1.781477937
+_B4 = -1.821255978
+_B5 = 1.330274429
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+
+def _norm_cdf(x: float) -> float:
+    """Standard normal CDF via the A&S 5-term rational approximation (symmetric for x<0)."""
+    ax = abs(x)
+    k = 1.0 / (1.0 + _P * ax)
+    poly = k * (_B1 + k * (_B2 + k * (_B3 + k * (_B4 + k * _B5))))
+    tail = _INV_SQRT_2PI * math.exp(-0.5 * ax * ax) * poly
+    return tail if x < 0 else 1.0 - tail
+
+
+def _bs_batch(S, K, T, r, sigma, is_call, out):
+    """
+    Loop-style Black-Scholes over SoA arrays; writes prices into out.
+    Invalid rows (T<=0, sigma<=0, S<=0, K<=0) get NaN.
+    """
+    n = K.shape[0]
+    for i in prange(n):
+        s = S[i]
+        k = K[i]
+        t = T[i]
+        sig = sigma[i]
+        if not (t > 0 and sig > 0 and s > 0 and k > 0):
+            out[i] = np.nan
+            continue
+        sqrt_t = math.sqrt(t)
+        d1 = (math.log(s / k) + (r + 0.5 * sig * sig) * t) / (sig * sqrt_t)
+        d2 = d1 - sig * sqrt_t
+        disc = math.exp(-r * t)
+        if is_call[i]:
+            out[i] = s * _norm_cdf(d1) - k * disc * _norm_cdf(d2)
+        else:
+            out[i] = k * disc * _norm_cdf(-d2) - s * _norm_cdf(-d1)
+
+
+if NUMBA_AVAILABLE:
+    _norm_cdf = njit(fastmath=_FASTMATH, cache=True)(_norm_cdf)
+    _bs_batch = njit(parallel=True, fastmath=_FASTMATH, cache=True)(_bs_batch)
+
+
+def bs_batch(
+    S: np.ndarray,
+    K: np.ndarray,
+    T: np.ndarray,
+    r: float,
+    sigma: np.ndarray,
+    is_call: np.ndarray,
+    out: np.ndarray,
+) -> np.ndarray:
+    """
+    Price a batch of contracts into out (same length as K). All arrays must be
+    contiguous and of equal length; S may be a broadcast spot array.
+    Uses the Numba kernel when available, else bs_price_vec.
+    """
+    if NUMBA_AVAILABLE and not _kernel_checked:
+        _check_kernel()
+    if NUMBA_AVAILABLE:
+        _bs_batch(S, K, T, float(r), sigma, is_call, out)
+    else:
+        out[:] = bs_price_vec(S, K, T, r, sigma, is_call)
+    return out
+
+
+def _run_kernel(S, K, T, r, sigma, is_call, out):
+    _bs_batch(S, K, T, float(r), sigma, is_call, out)
+    return out
+
+
+def _self_test() -> None:
+    """Assert the kernel matches bs_price_vec (scipy ndtr) on random inputs."""
+    rng = np.random.default_rng(0)
+    n = 200
+    S = rng.uniform(10, 500, n).astype(np.float32)
+    K = (S * rng.uniform(0.5, 1.5, n)).astype(np.float32)
+    T = rng.uniform(0.01, 2.0, n).astype(np.float32)
+    sigma = rng.uniform(0.05, 1.5, n).astype(np.float32)
+    is_call = rng.random(n) < 0.5
+    out = _run_kernel(S, K, T, 0.045, sigma, is_call, np.empty_like(K))
+    ref = bs_price_vec(S, K, T, 0.045, sigma, is_call)
+    err = np.max(np.abs(out - ref) / np.maximum(S, 1.0))
+    assert err < 1e-5, f"bs_batch deviates from reference by {err}"
+    bad = _run_kernel(
+        np.array([100.0, 0.0], dtype=np.float32), np.array([100.0, 100.0], dtype=np.float32),
+        np.array([0.0, 1.0], dtype=np.float32), 0.05, np.array([0.2, 0.2], dtype=np.float32),
+        np.array([True, True]), np.empty(2, dtype=np.float32),
+    )
+    assert np.isnan(bad).all()
+
+
+# The kernel is compiled and checked on the first bs_batch call, not at import
+_kernel_checked = False
+_check_lock = threading.Lock()
+
+
+def _check_kernel() -> None:
+    """Run _self_test once; fall back to the NumPy path if the kernel fails or disagrees."""
+    global NUMBA_AVAILABLE, _kernel_checked
+    with _check_lock:
+        if _kernel_checked:
+            return
+        try:
+            _self_test()
+        except AssertionError as e:
+            logger.warning("Numba BS kernel failed self-test, using NumPy path: %s", e)
+            NUMBA_AVAILABLE = False
+        except Exception as e:  # typing/lowering error, no usable threading layer, ...
+            logger.warning("Numba BS kernel unavailable, using NumPy path: %s", e)
+            NUMBA_AVAILABLE = False
+        _kernel_checked = True
+
+
+if __name__ == "__main__":
+    _self_test()
+    print(f"bs_numba self-test passed (numba={'on' if NUMBA_AVAILABLE else 'off'}).")
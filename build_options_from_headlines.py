@@ -13,11 +13,14 @@ Usage:
 import argparse
 import csv
 import logging
+import multiprocessing
 import os
 import re
 import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
 
-import numpy as np
+import pandas as pd
 
 logging.basicConfig(
     level=logging.INFO,
@@ -62,33 +65,130 @@ KNOWN_TICKERS = frozenset([
     "WELL", "VTR", "DLR", "CCI", "CBRE", "JLL", "CSGP", "Z",
 ])
 
+# Max concurrent Yahoo requests across worker threads (stay under Yahoo's rate limit)
+_YAHOO_SLOTS = threading.BoundedSemaphore(4)
+
+
+def _build_ticker_automaton():
+    """Aho-Corasick automaton over the 2-5 letter KNOWN_TICKERS; None if pyahocorasick is missing."""
+    try:
+        import ahocorasick
+    except ImportError:
+        return None
+    automaton = ahocorasick.Automaton()
+    for t in KNOWN_TICKERS:
+        if 2 <= len(t) <= 5 and t.isalpha():
+            automaton.add_word(t, t)
+    automaton.make_automaton()
+    return automaton
+
+
+_TICKER_AUTOMATON = _build_ticker_automaton()
+
+# Regex fallback when pyahocorasick is unavailable (no capture group needed)
+_TICKER_RE = re.compile(r"\b[A-Z]{2,5}\b")
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
 
 def extract_tickers_from_query(query: str) -> set[str]:
     """Extract known ticker symbols from a query string (e.g. 'Apple AAPL' -> AAPL)."""
     if not query or not query.strip():
         return set()
-    # Split on spaces and punctuation; take tokens that are known tickers
-    tokens = re.findall(r"\b([A-Z]{2,5})\b", query.upper())
-    return {t for t in tokens if t in KNOWN_TICKERS}
+    s = query if query.isupper() else query.upper()
+    if _TICKER_AUTOMATON is None:
+        # Split on spaces and punctuation; take tokens that are known tickers
+        return {t for t in _TICKER_RE.findall(s) if t in KNOWN_TICKERS}
+    # One pass over the text; keep only whole-word matches (same as the \b regex)
+    n = len(s)
+    found = set()
+    for end, t in _TICKER_AUTOMATON.iter(s):
+        start = end - len(t) + 1
+        if start > 0 and _is_word_char(s[start - 1]):
+            continue
+        if end + 1 < n and _is_word_char(s[end + 1]):
+            continue
+        found.add(t)
+    return found
+
+
+def _read_query_column(csv_path: str) -> list:
+    """Read only the query column; multithreaded pyarrow.csv when available, else pandas."""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        return pd.read_csv(csv_path, usecols=["query"], dtype=str, keep_default_na=False, encoding="utf-8")["query"].tolist()
+    tbl = pacsv.read_csv(
+        csv_path,
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(include_columns=["query"], column_types={"query": pa.string()}),
+    )
+    return tbl.column("query").to_pylist()
 
 
 def get_unique_tickers_from_headlines(csv_path: str) -> list[str]:
     """Extract all unique tickers mentioned in the headlines CSV query column."""
-    tickers = set()
     try:
-        with open(csv_path, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                q = row.get("query", "")
-                tickers.update(extract_tickers_from_query(q))
+        queries = _read_query_column(csv_path)
     except Exception as e:
         logger.exception("Failed to read %s: %s", csv_path, e)
         return []
-    result = sorted(tickers)
+    # Queries never span lines, so one newline-joined scan finds the same tickers
+    result = sorted(extract_tickers_from_query("\n".join(q for q in queries if q)))
     logger.info("Extracted %d unique tickers from %s", len(result), csv_path)
     return result
 
 
+def _fetch_ticker(
+    ticker: str, args: argparse.Namespace, spot: float = float("nan")
+) -> tuple[float, pd.DataFrame] | None:
+    """
+    Network stage: (spot, options_df) for one ticker, or None if either is unavailable.
+    spot comes from the batched get_spots call; fetched individually if missing.
+    """
+    from market_data import get_spot, get_options_chain
+
+    if spot != spot:
+        with _YAHOO_SLOTS:
+            spot = get_spot(ticker)
+    if spot != spot or spot <= 0:
+        logger.warning("No spot for %s, skipping", ticker)
+        return None
+    with _YAHOO_SLOTS:
+        options_df = get_options_chain(ticker, max_expirations=args.expirations)
+    if options_df is None or options_df.empty:
+        logger.warning("No options for %s, skipping", ticker)
+        return None
+    return spot, options_df
+
+
+def _score_ticker(
+    ticker: str, args: argparse.Namespace, sentiment_mean: float, spot: float, options_df: pd.DataFrame
+) -> list[dict]:
+    """CPU stage: score one ticker's chain and return its top output rows."""
+    from scoring import compute_scores, output_rows, top_by_abs_score
+
+    scored_df = compute_scores(options_df, spot, args.r, sentiment_mean)
+    if "opportunity_score" not in scored_df.columns:
+        return []
+    top = top_by_abs_score(scored_df, args.top_per_ticker)
+    logger.info("%s: %d options", ticker, len(top))
+    return output_rows(ticker, top)
+
+
+def _scoring_pool(args: argparse.Namespace) -> Executor:
+    """
+    Executor for _score_ticker: threads by default, or --processes spawned workers
+    (spawn, not fork: the parent may already have started Numba's thread pool).
+    """
+    if args.processes > 0:
+        return ProcessPoolExecutor(max_workers=args.processes, mp_context=multiprocessing.get_context("spawn"))
+    return ThreadPoolExecutor(max_workers=max(1, args.workers))
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Build big options CSV from headlines tickers"
@@ -114,6 +214,13 @@ def main() -> int:
     parser.add_argument("--r", type=float, default=0.045, help="Risk-free rate")
     parser.add_argument("--expirations", type=int, default=3, help="Max option expirations per ticker")
     parser.add_argument("--top_per_ticker", type=int, default=50, help="Top N options per ticker by |score|")
+    parser.add_argument("--workers", type=int, default=8, help="Worker threads for per-ticker scoring (default: 8)")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="Score in this many worker processes instead of --workers threads (default: 0 = threads)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore cached spot prices / option chains from earlier runs (they are still refreshed)")
+    parser.add_argument("--io-workers", type=int, default=16,
+                        help="Threads for Yahoo option-chain fetches (default: 16; Yahoo calls are still capped at 4 in flight)")
     args = parser.parse_args()
 
     if args.tickers.strip():
@@ -131,15 +238,8 @@ def main() -> int:
     headlines = []
     if os.path.isfile(args.headlines):
         try:
-            with open(args.headlines, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    headlines.append({
-                        "title": row.get("title", ""),
-                        "source": row.get("source", ""),
-                        "publishedAt": row.get("publishedAt", ""),
-                        "url": row.get("url", ""),
-                    })
+            from news_sentiment import load_headlines_csv
+            headlines = load_headlines_csv(args.headlines)
         except Exception as e:
             logger.warning("Could not load headlines for sentiment: %s. Using neutral.", e)
 
@@ -150,56 +250,46 @@ def main() -> int:
         sentiment_mean = res.get("sentiment_mean", 0.0)
         logger.info("Sentiment mean: %.4f", sentiment_mean)
 
-    from market_data import get_spot, get_options_chain
-    from scoring import compute_scores
-
-    OUTPUT_COLS = ["ticker", "expiration", "contractSymbol", "strike", "price", "bid", "midPrice", "score", "impliedVolatility"]
-
-    all_rows = []
-    for ticker in tickers:
-        try:
-            spot = get_spot(ticker)
-            if spot != spot or spot <= 0:
-                logger.warning("No spot for %s, skipping", ticker)
-                continue
-            options_df = get_options_chain(ticker, max_expirations=args.expirations)
-            if options_df is None or options_df.empty:
-                logger.warning("No options for %s, skipping", ticker)
-                continue
-            scored_df = compute_scores(options_df, spot, args.r, sentiment_mean)
-            if "opportunity_score" not in scored_df.columns:
-                continue
-            top = (
-                scored_df.assign(_abs=np.abs(scored_df["opportunity_score"]))
-                .nlargest(args.top_per_ticker, "_abs")
-                .drop(columns=["_abs"], errors="ignore")
-            )
-            for _, row in top.iterrows():
-                exp = row.get("expiration")
-                if hasattr(exp, "isoformat"):
-                    exp = exp.isoformat()
-                all_rows.append({
-                    "ticker": ticker,
-                    "expiration": str(exp) if exp is not None else "",
-                    "contractSymbol": str(row.get("contractSymbol", "")),
-                    "strike": row.get("strike", ""),
-                    "price": row.get("lastPrice", ""),
-                    "bid": row.get("bid", ""),
-                    "midPrice": row.get("mid_price", ""),
-                    "score": row.get("opportunity_score", ""),
-                    "impliedVolatility": row.get("impliedVolatility", ""),
-                })
-            logger.info("%s: %d options", ticker, len(top))
-        except Exception as e:
-            logger.warning("%s failed: %s", ticker, e)
+    # One batched request for every underlying's spot
+    import market_data
+    from scoring import OUTPUT_COLS
+    if args.no_cache:
+        market_data.READ_DISK_CACHE = False
+    spots = market_data.get_spots(tickers)
 
+    # Stream each ticker's rows to disk as soon as it finishes
+    total_rows = 0
+    written_tickers = set()
     with open(args.output, "w", newline="", encoding="utf-8") as f:
         w = csv.DictWriter(f, fieldnames=OUTPUT_COLS, extrasaction="ignore")
         w.writeheader()
-        w.writerows(all_rows)
+        # Fetches run on their own pool and hand each chain to the scoring pool as soon as
+        # it arrives, so slow Yahoo responses never hold up scoring of the ones already in
+        with ThreadPoolExecutor(max_workers=max(1, args.io_workers)) as io_pool, \
+                _scoring_pool(args) as cpu_pool:
+            pending = {io_pool.submit(_fetch_ticker, t, args, spots[t]): ("fetch", t) for t in tickers}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    stage, ticker = pending.pop(fut)
+                    try:
+                        result = fut.result()
+                    except Exception as e:
+                        logger.warning("%s failed: %s", ticker, e)
+                        continue
+                    if stage == "fetch":
+                        if result is not None:
+                            score_fut = cpu_pool.submit(_score_ticker, ticker, args, sentiment_mean, *result)
+                            pending[score_fut] = ("score", ticker)
+                        continue
+                    if not result:
+                        continue
+                    w.writerows(result)
+                    f.flush()
+                    total_rows += len(result)
+                    written_tickers.add(ticker)
 
-    unique_tickers = len(set(r["ticker"] for r in all_rows))
-    logger.info("Wrote %s (%d rows, %d tickers)", args.output, len(all_rows), unique_tickers)
+    logger.info("Wrote %s (%d rows, %d tickers)", args.output, total_rows, len(written_tickers))
     return 0
 
 
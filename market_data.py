@@ -1,9 +1,13 @@
 """
 Market data module: spot price, historical OHLC, and options chain via yfinance.
 """
-from datetime import datetime, timezone, timedelta
+from datetime import timezone
+from pathlib import Path
 from zoneinfo import ZoneInfo
+import functools
 import logging
+import pickle
+import time
 from typing import Optional
 
 import numpy as np
@@ -16,25 +20,140 @@ logger = logging.getLogger(__name__)
 ET = ZoneInfo("America/New_York")
 UTC = timezone.utc
 
+# Option chains and expiration lists are cached in-process and in pickle
+# sidecars for CHAIN_TTL_SECONDS so re-runs skip the network entirely;
+# spot prices likewise for SPOT_TTL_SECONDS.
+CACHE_DIR = Path.home() / ".cache" / "scholes"
+CHAIN_TTL_SECONDS = 900
+SPOT_TTL_SECONDS = 60
+# Set False (e.g. from a --no-cache flag) to ignore saved sidecars; fresh data is still saved
+READ_DISK_CACHE = True
+
+
+@functools.lru_cache(maxsize=512)
+def _get_ticker(ticker: str) -> yf.Ticker:
+    """Return a shared yf.Ticker for the symbol (one object per process)."""
+    return yf.Ticker(ticker)
+
+
+def _ttl_bucket(ttl: int = CHAIN_TTL_SECONDS) -> int:
+    """Current cache bucket; changes every ttl seconds."""
+    return int(time.time() // ttl)
+
+
+def _read_sidecar(name: str, bucket: int):
+    """Load a pickled payload saved in the same TTL bucket, or None on miss."""
+    if not READ_DISK_CACHE:
+        return None
+    path = CACHE_DIR / f"{name}.pkl"
+    try:
+        with open(path, "rb") as f:
+            saved_bucket, payload = pickle.load(f)
+        return payload if saved_bucket == bucket else None
+    except Exception:
+        return None
+
+
+def _write_sidecar(name: str, bucket: int, payload) -> None:
+    """Pickle payload to the sidecar cache; failures are logged and ignored."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(CACHE_DIR / f"{name}.pkl", "wb") as f:
+            pickle.dump((bucket, payload), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        logger.debug("Could not write cache %s: %s", name, e)
+
+
+@functools.lru_cache(maxsize=512)
+def _cached_expirations(ticker: str, bucket: int) -> tuple[str, ...]:
+    """Expiration dates for ticker, cached per TTL bucket."""
+    name = f"{ticker}_options"
+    hit = _read_sidecar(name, bucket)
+    if hit is not None:
+        return hit
+    expirations = tuple(_get_ticker(ticker).options or ())
+    if expirations:
+        _write_sidecar(name, bucket, expirations)
+    return expirations
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_chain(ticker: str, exp: str, bucket: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    (calls, puts) for one expiration, cached per TTL bucket.
+    The returned frames are shared between callers; copy before mutating.
+    """
+    name = f"{ticker}_{exp}"
+    hit = _read_sidecar(name, bucket)
+    if hit is not None:
+        return hit
+    chain = _get_ticker(ticker).option_chain(exp)
+    out = (chain.calls, chain.puts)
+    _write_sidecar(name, bucket, out)
+    return out
+
 
 def get_spot(ticker: str) -> float:
     """
     Fetch last close price for the underlying using yfinance.
     Returns last close as float; NaN on failure.
     """
+    bucket = _ttl_bucket(SPOT_TTL_SECONDS)
+    hit = _read_sidecar(f"{ticker}_spot", bucket)
+    if hit is not None:
+        return hit
     try:
-        t = yf.Ticker(ticker)
+        t = _get_ticker(ticker)
         hist = t.history(period="1d")
         if hist is None or hist.empty:
             logger.warning("No history returned for %s", ticker)
             return float("nan")
-        close = hist["Close"].iloc[-1]
-        return float(close)
+        close = float(hist["Close"].iloc[-1])
+        _write_sidecar(f"{ticker}_spot", bucket, close)
+        return close
     except Exception as e:
         logger.exception("get_spot failed for %s: %s", ticker, e)
         return float("nan")
 
 
+def get_spots(tickers: list[str]) -> dict[str, float]:
+    """
+    Fetch last close for many underlyings in one yf.download request.
+    Returns {ticker: close}; tickers with no data map to NaN.
+    """
+    spots = {t: float("nan") for t in tickers}
+    bucket = _ttl_bucket(SPOT_TTL_SECONDS)
+    missing = []
+    for t in tickers:
+        hit = _read_sidecar(f"{t}_spot", bucket)
+        if hit is not None:
+            spots[t] = hit
+        else:
+            missing.append(t)
+    if not missing:
+        return spots
+    try:
+        data = yf.download(
+            " ".join(missing), period="1d", group_by="ticker", threads=True, progress=False
+        )
+    except Exception as e:
+        logger.exception("get_spots failed for %d tickers: %s", len(missing), e)
+        return spots
+    if data is None or data.empty:
+        logger.warning("No history returned for %d tickers", len(missing))
+        return spots
+    for t in missing:
+        try:
+            close = data[t]["Close"] if isinstance(data.columns, pd.MultiIndex) else data["Close"]
+            close = close.dropna()
+            if not close.empty:
+                spots[t] = float(close.iloc[-1])
+                _write_sidecar(f"{t}_spot", bucket, spots[t])
+        except KeyError:
+            continue
+    return spots
+
+
 def get_history(ticker: str, period: str = "1mo") -> pd.DataFrame:
     """
     Fetch historical OHLCV for the ticker using yfinance.
@@ -43,7 +162,7 @@ def get_history(ticker: str, period: str = "1mo") -> pd.DataFrame:
     Empty DataFrame on failure.
     """
     try:
-        t = yf.Ticker(ticker)
+        t = _get_ticker(ticker)
         hist = t.history(period=period)
         if hist is None or hist.empty:
             logger.warning("No history returned for %s period=%s", ticker, period)
@@ -65,7 +184,7 @@ def get_quote(ticker: str) -> Optional[dict]:
     Returns dict with currentPrice, dayChangePercent, or None on failure.
     """
     try:
-        t = yf.Ticker(ticker)
+        t = _get_ticker(ticker)
         hist = t.history(period="5d")
         if hist is None or hist.empty or len(hist) < 2:
             close = get_spot(ticker)
@@ -81,24 +200,16 @@ def get_quote(ticker: str) -> Optional[dict]:
         return None
 
 
-def _expiration_to_utc(exp: str) -> Optional[datetime]:
+def _expirations_to_utc(expirations) -> pd.DatetimeIndex:
     """
-    Convert expiration string (YYYY-MM-DD) to UTC datetime at 16:00 US/Eastern,
-    or 20:00 UTC if timezone conversion fails.
+    Convert expiration strings (YYYY-MM-DD) to UTC timestamps at 16:00 US/Eastern,
+    or 20:00 UTC if timezone conversion fails. Unparseable dates become NaT.
     """
+    dates = pd.to_datetime(list(expirations), format="%Y-%m-%d", errors="coerce")
     try:
-        # Parse date only
-        dt_et = datetime.strptime(exp, "%Y-%m-%d").replace(
-            hour=16, minute=0, second=0, microsecond=0, tzinfo=ET
-        )
-        return dt_et.astimezone(UTC)
+        return (dates + pd.Timedelta(hours=16)).tz_localize(ET).tz_convert(UTC)
     except Exception:
-        try:
-            return datetime.strptime(exp, "%Y-%m-%d").replace(
-                hour=20, minute=0, second=0, microsecond=0, tzinfo=UTC
-            )
-        except Exception:
-            return None
+        return (dates + pd.Timedelta(hours=20)).tz_localize(UTC)
 
 
 def get_options_chain(ticker: str, max_expirations: int = 6) -> pd.DataFrame:
@@ -106,9 +217,9 @@ def get_options_chain(ticker: str, max_expirations: int = 6) -> pd.DataFrame:
     Fetch options chain for ticker for up to max_expirations expirations.
     Returns a DataFrame with standardized columns and computed mid_price, spread, time_to_expiry_years.
     """
+    bucket = _ttl_bucket()
     try:
-        t = yf.Ticker(ticker)
-        expirations = t.options
+        expirations = _cached_expirations(ticker, bucket)
         if not expirations:
             logger.warning("No expirations for %s", ticker)
             return pd.DataFrame()
@@ -117,31 +228,25 @@ def get_options_chain(ticker: str, max_expirations: int = 6) -> pd.DataFrame:
         return pd.DataFrame()
 
     expirations = expirations[:max_expirations]
-    now_utc = datetime.now(UTC)
     SECONDS_PER_YEAR = 365 * 24 * 3600
     rows: list[pd.DataFrame] = []
 
-    for exp in expirations:
+    # Parse all expirations and their time to expiry in one batch (NaT -> NaN years)
+    exp_utc = _expirations_to_utc(expirations)
+    T_years_arr = np.maximum((exp_utc - pd.Timestamp.now(tz=UTC)).total_seconds(), 0) / SECONDS_PER_YEAR
+
+    for i, exp in enumerate(expirations):
         try:
-            chain = t.option_chain(exp)
-            calls = chain.calls.copy()
-            puts = chain.puts.copy()
-            calls["option_type"] = "call"
-            puts["option_type"] = "put"
-            expiration_utc = _expiration_to_utc(exp)
-            if expiration_utc is not None:
-                T_sec = max((expiration_utc - now_utc).total_seconds(), 0)
-                T_years = T_sec / SECONDS_PER_YEAR
-            else:
-                T_years = float("nan")
-
-            for df in (calls, puts):
-                df["expiration"] = expiration_utc
-                df["ticker"] = ticker
-                df["time_to_expiry_years"] = T_years
-
-            rows.append(calls)
-            rows.append(puts)
+            calls, puts = _cached_chain(ticker, exp, bucket)
+            # One assign() per side adds all broadcast columns in a single new frame,
+            # so the cached chain is never mutated
+            common = {
+                "expiration": exp_utc[i],
+                "ticker": ticker,
+                "time_to_expiry_years": float(T_years_arr[i]),
+            }
+            rows.append(calls.assign(option_type="call", **common))
+            rows.append(puts.assign(option_type="put", **common))
         except Exception as e:
             logger.warning("option_chain failed for %s exp %s: %s", ticker, exp, e)
             continue
@@ -160,17 +265,17 @@ def get_options_chain(ticker: str, max_expirations: int = 6) -> pd.DataFrame:
         if col not in out.columns:
             out[col] = None if col in ("bid", "ask", "volume", "openInterest", "impliedVolatility") else ""
 
-    # Numeric where needed
-    for col in ("strike", "lastPrice", "bid", "ask", "volume", "openInterest", "impliedVolatility"):
-        if col in out.columns:
-            out[col] = pd.to_numeric(out[col], errors="coerce")
+    # Numeric where needed (one bulk conversion over the numeric subset)
+    numeric_cols = ["strike", "lastPrice", "bid", "ask", "volume", "openInterest", "impliedVolatility"]
+    out[numeric_cols] = out[numeric_cols].apply(pd.to_numeric, errors="coerce")
 
     # mid_price and spread
-    bid = out["bid"].fillna(0)
-    ask = out["ask"].fillna(0)
-    last = out["lastPrice"].fillna(0)
-    out["mid_price"] = np.where((bid > 0) & (ask > 0), (bid + ask) / 2, last)
-    out["spread"] = np.where((bid > 0) & (ask > 0), ask - bid, float("nan"))
+    bid = out["bid"].fillna(0).to_numpy()
+    ask = out["ask"].fillna(0).to_numpy()
+    last = out["lastPrice"].fillna(0).to_numpy()
+    has_quote = (bid > 0) & (ask > 0)
+    out["mid_price"] = np.where(has_quote, (bid + ask) / 2, last)
+    out["spread"] = np.where(has_quote, ask - bid, float("nan"))
 
     # Keep standardized set
     keep = [
@@ -179,4 +284,4 @@ def get_options_chain(ticker: str, max_expirations: int = 6) -> pd.DataFrame:
         "mid_price", "spread", "time_to_expiry_years",
     ]
     existing = [c for c in keep if c in out.columns]
-    return out[existing].copy()
+    return out[existing]
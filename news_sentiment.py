@@ -1,8 +1,22 @@
 """
 News headlines fetch (NewsAPI and Yahoo Finance) and sentiment scoring (FinBERT with VADER fallback).
 """
+import contextlib
+import hashlib
+import json
 import logging
-from typing import Any
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
 
 from newsapi_client import fetch_headlines as fetch_headlines_newsapi
 
@@ -10,26 +24,112 @@ logger = logging.getLogger(__name__)
 
 # FinBERT / VADER availability
 _finbert_pipeline = None
+_finbert_on_gpu = False
+_finbert_autocast_dtype = None  # set when the torch model runs on CUDA
+_finbert_backend = None
+_http_session = None
 _vader_analyzer = None
+# Ticker worker threads share one model; the lock keeps concurrent first calls from loading it twice
+_model_load_lock = threading.Lock()
+
+# Headline results keyed by request args + hour bucket: in-process LRU, JSON files
+# under HEADLINE_CACHE_DIR (so CLI re-runs skip the fetch), optionally Redis
+HEADLINE_TTL_SECONDS = 3600
+HEADLINE_CACHE_DIR = Path.home() / ".cache" / "scholes"
+_HEADLINE_CACHE_SIZE = 512
+_headline_cache: OrderedDict[tuple, list[dict]] = OrderedDict()
+_headline_cache_lock = threading.Lock()
+_redis_client = None
+
+# Headlines are short, so CUDA batches can be much larger than CPU ones
+# (_finbert_batch_size scales FINBERT_BATCH_GPU by median title length)
+FINBERT_BATCH_CPU = 32
+FINBERT_BATCH_GPU = 128
+
+# VADER runs ~0.2 ms per title; below this, process start-up outweighs the split
+VADER_PARALLEL_MIN = 5000
+
+# model_preference="cascade": VADER scores beyond this |compound| are kept as-is,
+# only the less certain headlines go through FinBERT
+CASCADE_VADER_THRESHOLD = 0.6
+
+
+def _finbert_device() -> tuple[Any, Any]:
+    """Pick (device, torch_dtype) for FinBERT: CUDA half precision, else MPS, else CPU fp32."""
+    import torch
+    if torch.cuda.is_available():
+        dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        return 0, dtype
+    if getattr(torch.backends, "mps", None) is not None and torch.backends.mps.is_available():
+        return "mps", torch.float32
+    return -1, torch.float32
+
+
+def _load_finbert_onnx(model_dir: str) -> Any:
+    """
+    FinBERT pipeline over an ONNX Runtime export (e.g. from
+    `optimum-cli export onnx --model ProsusAI/finbert --task text-classification DIR`,
+    optionally int8-quantized with `optimum-cli onnxruntime quantize`).
+    """
+    global _finbert_on_gpu
+    import torch
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoTokenizer, pipeline
+    provider = "CUDAExecutionProvider" if torch.cuda.is_available() else "CPUExecutionProvider"
+    model = ORTModelForSequenceClassification.from_pretrained(model_dir, provider=provider)
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    _finbert_on_gpu = provider == "CUDAExecutionProvider"
+    logger.info("FinBERT loaded from ONNX export %s (%s)", model_dir, provider)
+    return pipeline("sentiment-analysis", model=model, tokenizer=tokenizer, truncation=True, max_length=512)
 
 
 def _get_finbert() -> Any:
-    """Lazy-load FinBERT pipeline; return None if unavailable."""
-    global _finbert_pipeline
+    """
+    Lazy-load FinBERT pipeline; return None if unavailable.
+    FINBERT_ONNX_DIR=path runs an ONNX Runtime export instead of the torch model;
+    FINBERT_COMPILE=1 wraps the torch model in torch.compile (CUDA graphs).
+    On CPU the Linear layers are int8-quantized unless FINBERT_QUANTIZE=0.
+    """
+    global _finbert_pipeline, _finbert_on_gpu, _finbert_autocast_dtype
     if _finbert_pipeline is not None:
         return _finbert_pipeline
-    try:
-        from transformers import pipeline
-        _finbert_pipeline = pipeline(
-            "sentiment-analysis",
-            model="ProsusAI/finbert",
-            truncation=True,
-            max_length=512,
-        )
-        return _finbert_pipeline
-    except Exception as e:
-        logger.warning("FinBERT unavailable, will use VADER: %s", e)
-        return None
+    with _model_load_lock:
+        if _finbert_pipeline is not None:
+            return _finbert_pipeline
+        try:
+            onnx_dir = os.environ.get("FINBERT_ONNX_DIR", "").strip()
+            if onnx_dir:
+                _finbert_pipeline = _load_finbert_onnx(onnx_dir)
+                return _finbert_pipeline
+            from transformers import pipeline
+            device, dtype = _finbert_device()
+            pipe = pipeline(
+                "sentiment-analysis",
+                model="ProsusAI/finbert",
+                truncation=True,
+                max_length=512,
+                device=device,
+                torch_dtype=dtype,
+            )
+            _finbert_on_gpu = device == 0
+            if _finbert_on_gpu:
+                _finbert_autocast_dtype = dtype
+            elif device == -1 and os.environ.get("FINBERT_QUANTIZE", "1").strip() != "0":
+                # int8 dynamic quantization of the Linear layers (VNNI/AVX2 int8 GEMMs on CPU)
+                import torch
+                pipe.model = torch.ao.quantization.quantize_dynamic(
+                    pipe.model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+                dtype = torch.qint8
+            if os.environ.get("FINBERT_COMPILE", "").strip() == "1":
+                import torch
+                pipe.model = torch.compile(pipe.model, mode="reduce-overhead")
+            logger.info("FinBERT loaded on %s (%s)", "cpu" if device == -1 else device, dtype)
+            _finbert_pipeline = pipe
+            return _finbert_pipeline
+        except Exception as e:
+            logger.warning("FinBERT unavailable, will use VADER: %s", e)
+            return None
 
 
 def _get_vader() -> Any:
@@ -37,18 +137,40 @@ def _get_vader() -> Any:
     global _vader_analyzer
     if _vader_analyzer is not None:
         return _vader_analyzer
-    try:
-        import nltk
+    with _model_load_lock:
+        if _vader_analyzer is not None:
+            return _vader_analyzer
         try:
-            nltk.data.find("sentiment/vader_lexicon.zip")
-        except LookupError:
-            nltk.download("vader_lexicon", quiet=True)
-        from nltk.sentiment.vader import SentimentIntensityAnalyzer
-        _vader_analyzer = SentimentIntensityAnalyzer()
-        return _vader_analyzer
-    except Exception as e:
-        logger.warning("VADER unavailable: %s", e)
-        return None
+            import nltk
+            try:
+                nltk.data.find("sentiment/vader_lexicon.zip")
+            except LookupError:
+                nltk.download("vader_lexicon", quiet=True)
+            from nltk.sentiment.vader import SentimentIntensityAnalyzer
+            _vader_analyzer = SentimentIntensityAnalyzer()
+            return _vader_analyzer
+        except Exception as e:
+            logger.warning("VADER unavailable: %s", e)
+            return None
+
+
+_NON_WORD_RE = re.compile(r"\W+")
+
+# Yahoo stream keys vary: title, link/url, provider/source, publishTime/providerPublishTime
+_YKEYS_TITLE = ("title", "headline")
+_YKEYS_URL = ("link", "url")
+_YKEYS_SRC = ("provider", "source")
+_YKEYS_SRC_NAME = ("name", "displayName")
+_YKEYS_PUB = ("providerPublishTime", "publishTime", "publishedAt", "published")
+
+
+def _first(d: dict, keys: tuple[str, ...]) -> Any:
+    """First truthy value among d[keys], else None."""
+    for k in keys:
+        v = d.get(k)
+        if v:
+            return v
+    return None
 
 
 def fetch_headlines_yahoo(ticker: str, n: int = 20) -> list[dict]:
@@ -68,18 +190,16 @@ def fetch_headlines_yahoo(ticker: str, n: int = 20) -> list[dict]:
         for a in raw:
             if not isinstance(a, dict):
                 continue
-            # Yahoo stream keys vary: title, link/url, provider/source, publishTime/providerPublishTime
-            title = a.get("title") or a.get("headline") or ""
-            url = a.get("link") or a.get("url") or ""
-            source = a.get("provider") or a.get("source")
+            title = _first(a, _YKEYS_TITLE) or ""
+            url = _first(a, _YKEYS_URL) or ""
+            source = _first(a, _YKEYS_SRC)
             if isinstance(source, dict):
-                source = source.get("name") or source.get("displayName") or ""
+                source = _first(source, _YKEYS_SRC_NAME)
             source = source or ""
-            pub = a.get("providerPublishTime") or a.get("publishTime") or a.get("publishedAt") or a.get("published")
+            pub = _first(a, _YKEYS_PUB)
             if pub is not None and hasattr(pub, "isoformat"):
                 published_at = pub.isoformat()
             elif isinstance(pub, (int, float)):
-                from datetime import datetime, timezone
                 try:
                     published_at = datetime.fromtimestamp(int(pub), tz=timezone.utc).isoformat()
                 except (OSError, ValueError):
@@ -113,68 +233,425 @@ def fetch_headlines(
 
     - source "newsapi": uses query and api_key (NewsAPI). Caches to CSV and uses cache first to save API credits.
     - source "yahoo": uses ticker (Yahoo Finance via yfinance). query and api_key ignored.
+
+    Republished copies of a story (same normalized title) are dropped.
+    Non-empty results are cached for the current hour, in-process and on disk (and via
+    Redis when REDIS_URL is set); use_cache=False bypasses this as well as the CSV cache.
     """
     if source == "yahoo":
-        ticker_to_use = (ticker or "").strip().upper() or "SPY"
-        return fetch_headlines_yahoo(ticker_to_use, n=n)
-    return fetch_headlines_newsapi(
-        query or "SPY OR S&P 500",
-        api_key,
-        n=n,
-        use_cache=use_cache,
-        cache_max_age_hours=cache_max_age_hours,
-    )
-
-
-def _score_finbert(headlines: list[dict], batch_size: int = 32) -> list[float]:
-    """Score each headline with FinBERT; return list of scores in [-1, 1]. Batched for speed."""
+        key = ("yahoo", (ticker or "").strip().upper() or "SPY", n)
+    else:
+        key = ("newsapi", query or "SPY OR S&P 500", n, cache_max_age_hours)
+    key += (int(time.time() // HEADLINE_TTL_SECONDS),)
+    if use_cache:
+        cached = _headline_cache_get(key)
+        if cached is not None:
+            return cached
+
+    if source == "yahoo":
+        out = fetch_headlines_yahoo(key[1], n=n)
+    else:
+        out = fetch_headlines_newsapi(
+            key[1],
+            api_key,
+            n=n,
+            use_cache=use_cache,
+            cache_max_age_hours=cache_max_age_hours,
+        )
+    out = _dedup_by_title(out)
+    if out:
+        _headline_cache_put(key, out)
+    return out
+
+
+HEADLINE_FIELDS = ("title", "source", "publishedAt", "url")
+
+
+def load_headlines_csv(path: str) -> list[dict]:
+    """
+    Load {"title", "source", "publishedAt", "url"} dicts from a headlines CSV.
+    Only those columns are parsed (multithreaded pyarrow.csv when available, else the pandas
+    C reader; strings kept verbatim); missing ones come back as "".
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        pacsv = None
+    if pacsv is not None:
+        try:
+            tbl = pacsv.read_csv(
+                path,
+                parse_options=pacsv.ParseOptions(newlines_in_values=True),
+                convert_options=pacsv.ConvertOptions(
+                    include_columns=list(HEADLINE_FIELDS),
+                    include_missing_columns=True,
+                    column_types={c: pa.string() for c in HEADLINE_FIELDS},
+                    strings_can_be_null=False,
+                ),
+            )
+        except pa.ArrowInvalid as e:
+            if "Empty CSV file" in str(e):
+                return []
+            raise
+        cols = [[v if v is not None else "" for v in tbl.column(c).to_pylist()] for c in HEADLINE_FIELDS]
+        return [dict(zip(HEADLINE_FIELDS, vals)) for vals in zip(*cols)]
+    try:
+        df = pd.read_csv(
+            path,
+            usecols=lambda c: c in HEADLINE_FIELDS,
+            dtype=str,
+            keep_default_na=False,
+            encoding="utf-8",
+        )
+    except pd.errors.EmptyDataError:
+        return []
+    return df.reindex(columns=list(HEADLINE_FIELDS), fill_value="").fillna("").to_dict("records")
+
+
+def _dedup_by_title(headlines: list[dict]) -> list[dict]:
+    """
+    Drop republished copies of the same story: keep the first headline per
+    normalized title (lowercase, word characters only, first 80). Untitled items are kept.
+    """
+    seen = set()
+    out = []
+    for h in headlines:
+        key = _NON_WORD_RE.sub("", (h.get("title") or "").lower())[:80]
+        if key:
+            if key in seen:
+                continue
+            seen.add(key)
+        out.append(h)
+    return out
+
+
+def _get_redis() -> Any:
+    """Redis client from REDIS_URL for sharing headlines across processes; None if unset/unavailable."""
+    global _redis_client
+    url = os.environ.get("REDIS_URL", "").strip()
+    if not url:
+        return None
+    if _redis_client is None:
+        try:
+            import redis
+            _redis_client = redis.Redis.from_url(url)
+        except Exception as e:
+            logger.warning("Redis unavailable, using in-process headline cache only: %s", e)
+            return None
+    return _redis_client
+
+
+def _redis_key(key: tuple) -> str:
+    return "hl:" + hashlib.md5(repr(key).encode("utf-8")).hexdigest()
+
+
+def _headline_disk_path(key: tuple) -> Path:
+    # Hour bucket excluded from the name so each request has one file, overwritten hourly
+    return HEADLINE_CACHE_DIR / f"headlines_{hashlib.md5(repr(key[:-1]).encode('utf-8')).hexdigest()}.json"
+
+
+def _headline_disk_get(key: tuple) -> list[dict] | None:
+    try:
+        with open(_headline_disk_path(key), "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        return saved["headlines"] if saved.get("bucket") == key[-1] else None
+    except Exception:
+        return None
+
+
+def _headline_disk_put(key: tuple, headlines: list[dict]) -> None:
+    try:
+        HEADLINE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(_headline_disk_path(key), "w", encoding="utf-8") as f:
+            json.dump({"bucket": key[-1], "headlines": headlines}, f)
+    except Exception as e:
+        logger.debug("Could not write headline cache: %s", e)
+
+
+def _headline_cache_get(key: tuple) -> list[dict] | None:
+    """Cached headlines for key (in-process LRU, then disk, then Redis); None on miss."""
+    with _headline_cache_lock:
+        hit = _headline_cache.get(key)
+        if hit is not None:
+            _headline_cache.move_to_end(key)
+            return list(hit)
+    out = _headline_disk_get(key)
+    if out is not None:
+        _headline_cache_put(key, out, persist=False)
+        return list(out)
+    r = _get_redis()
+    if r is None:
+        return None
+    try:
+        raw = r.get(_redis_key(key))
+    except Exception as e:
+        logger.warning("Redis get failed: %s", e)
+        return None
+    if raw is None:
+        return None
+    out = json.loads(raw)
+    _headline_cache_put(key, out, persist=False)
+    return list(out)
+
+
+def _headline_cache_put(key: tuple, headlines: list[dict], persist: bool = True) -> None:
+    """Store non-empty results in the in-process LRU (plus disk and Redis, if configured, when persist)."""
+    with _headline_cache_lock:
+        _headline_cache[key] = list(headlines)
+        _headline_cache.move_to_end(key)
+        while len(_headline_cache) > _HEADLINE_CACHE_SIZE:
+            _headline_cache.popitem(last=False)
+    if not persist:
+        return
+    _headline_disk_put(key, headlines)
+    r = _get_redis()
+    if r is not None:
+        try:
+            r.setex(_redis_key(key), HEADLINE_TTL_SECONDS, json.dumps(headlines))
+        except Exception as e:
+            logger.warning("Redis set failed: %s", e)
+
+
+def _classify_remote(url: str, model: str) -> Callable[[list[str]], list[dict]]:
+    """
+    Classifier that POSTs titles to an Infinity/TEI-style /classify endpoint over a
+    keep-alive session. Returns the top {"label", "score"} per title.
+    """
+    import requests
+
+    global _http_session
+    if _http_session is None:
+        _http_session = requests.Session()
+    endpoint = url.rstrip("/") + "/classify"
+
+    def classify(titles: list[str]) -> list[dict]:
+        resp = _http_session.post(endpoint, json={"model": model, "input": titles}, timeout=30)
+        resp.raise_for_status()
+        out = []
+        for item in resp.json().get("data", []):
+            # Per-title result is either one {"label", "score"} or a list over all labels
+            if isinstance(item, list):
+                item = max(item, key=lambda x: x.get("score", 0.0)) if item else {}
+            out.append(item)
+        return out
+
+    return classify
+
+
+def _classify_local(pipe: Any) -> Callable[[list[str]], list[dict]]:
+    """Classifier over the in-process FinBERT pipeline (inference mode, autocast on CUDA)."""
+    import torch
+
+    def classify(titles: list[str]) -> list[dict]:
+        autocast = (
+            torch.autocast("cuda", dtype=_finbert_autocast_dtype)
+            if _finbert_autocast_dtype is not None
+            else contextlib.nullcontext()
+        )
+        with torch.inference_mode(), autocast:
+            results = pipe(titles, batch_size=len(titles), truncation=True)
+        return results if isinstance(results, list) else [results]
+
+    return classify
+
+
+def _get_finbert_backend() -> Callable[[list[str]], list[dict]] | None:
+    """
+    FinBERT classifier: a remote serving engine when INFINITY_URL is set
+    (model from INFINITY_MODEL), else the local pipeline. None if neither is usable.
+    """
+    global _finbert_backend
+    if _finbert_backend is not None:
+        return _finbert_backend
+    url = os.environ.get("INFINITY_URL", "").strip()
+    if url:
+        _finbert_backend = _classify_remote(url, os.environ.get("INFINITY_MODEL", "ProsusAI/finbert"))
+        logger.info("FinBERT scoring via %s", url)
+        return _finbert_backend
     pipe = _get_finbert()
     if pipe is None:
+        return None
+    _finbert_backend = _classify_local(pipe)
+    return _finbert_backend
+
+
+def _title_lengths(titles: list[str]) -> list[int]:
+    """
+    Token counts from the local pipeline's (fast) tokenizer in one batched call;
+    character lengths when scoring remotely or if tokenizing fails.
+    """
+    tokenizer = getattr(_finbert_pipeline, "tokenizer", None)
+    if tokenizer is not None and titles:
+        try:
+            ids = tokenizer(titles, truncation=True, max_length=512)["input_ids"]
+            return [len(x) for x in ids]
+        except Exception as e:
+            logger.debug("Tokenizer length pass failed, using characters: %s", e)
+    return [len(t) for t in titles]
+
+
+def _unique_titles(headlines: list[dict], max_len: int | None = None) -> tuple[list[str], list[int]]:
+    """
+    Stripped, non-empty distinct titles plus, per headline, its index into them
+    (-1 for an empty title). Reposted wire stories are then scored once.
+    """
+    unique: dict[str, int] = {}
+    pos = []
+    for h in headlines:
+        t = (h.get("title") or "").strip()[:max_len]
+        pos.append(unique.setdefault(t, len(unique)) if t else -1)
+    return list(unique), pos
+
+
+def _finbert_batch_size(lengths: list[int]) -> int:
+    """Batch size for FinBERT: FINBERT_BATCH_CPU on CPU; on CUDA larger for shorter titles."""
+    if not _finbert_on_gpu or not lengths:
+        return FINBERT_BATCH_CPU
+    med = float(np.median(lengths))
+    if med < 32:
+        return 2 * FINBERT_BATCH_GPU
+    if med < 128:
+        return FINBERT_BATCH_GPU
+    return FINBERT_BATCH_GPU // 4
+
+
+def _is_cuda_oom(e: Exception) -> bool:
+    """True for torch.cuda.OutOfMemoryError (and the older RuntimeError form)."""
+    return type(e).__name__ == "OutOfMemoryError" or "CUDA out of memory" in str(e)
+
+
+def _empty_cuda_cache() -> None:
+    try:
+        import torch
+        torch.cuda.empty_cache()
+    except Exception:
+        pass
+
+
+def _score_finbert(headlines: list[dict], batch_size: int | None = None) -> list[float]:
+    """
+    Score each headline with FinBERT; return list of scores in [-1, 1]. Batched for speed.
+    batch_size defaults to _finbert_batch_size (by median title length on CUDA) and is
+    halved whenever a CUDA batch runs out of memory.
+    Duplicate titles are scored once, and titles are batched shortest-first (by token
+    count) so each batch pads only to its own longest title.
+    """
+    classify = _get_finbert_backend()
+    if classify is None:
         return []
-    titles = [(h.get("title") or "").strip()[:512] for h in headlines]
-    scores = [0.0] * len(headlines)
-    # Process in batches for ~10x speedup
-    for i in range(0, len(titles), batch_size):
-        batch = titles[i : i + batch_size]
-        valid_idx = [j for j, t in enumerate(batch) if t]
-        if not valid_idx:
+    titles, pos = _unique_titles(headlines, max_len=512)
+    lengths = _title_lengths(titles)
+    order = sorted(range(len(titles)), key=lengths.__getitem__)
+    if batch_size is None:
+        batch_size = _finbert_batch_size(lengths)
+    title_scores = [0.0] * len(titles)
+    i = 0
+    while i < len(order):
+        idx = order[i : i + batch_size]
+        try:
+            results = classify([titles[j] for j in idx])
+        except Exception as e:
+            if _is_cuda_oom(e) and batch_size > 1:
+                batch_size //= 2
+                logger.warning("FinBERT out of GPU memory, retrying with batch_size=%d", batch_size)
+                _empty_cuda_cache()
+                continue
+            logger.warning("FinBERT batch failed: %s", e)
+            i += len(idx)
             continue
-        valid_titles = [batch[j] for j in valid_idx]
+        i += len(idx)
+        for j, res in zip(idx, results):
+            label = (res.get("label") or "").lower()
+            conf = float(res.get("score", 0.5))
+            if label == "positive":
+                title_scores[j] = conf
+            elif label == "negative":
+                title_scores[j] = -conf
+    return [title_scores[p] if p >= 0 else 0.0 for p in pos]
+
+
+def _vader_chunk(titles: list[str]) -> list[float]:
+    """VADER compound per title (0.0 on failure). Also runs in pool workers, each loading its own analyzer."""
+    analyzer = _get_vader()
+    if analyzer is None:
+        return [0.0] * len(titles)
+    polarity_scores = analyzer.polarity_scores
+    out = []
+    for title in titles:
         try:
-            results = pipe(valid_titles, batch_size=min(batch_size, len(valid_titles)), truncation=True)
-            if not isinstance(results, list):
-                results = [results]
-            for k, res in enumerate(results):
-                if k >= len(valid_idx):
-                    break
-                head_idx = i + valid_idx[k]
-                label = (res.get("label") or "").lower()
-                conf = float(res.get("score", 0.5))
-                if label == "positive":
-                    scores[head_idx] = conf
-                elif label == "negative":
-                    scores[head_idx] = -conf
+            out.append(float(polarity_scores(title).get("compound", 0.0)))
         except Exception:
-            pass
-    return scores
+            out.append(0.0)
+    return out
+
+
+def _vader_parallel(titles: list[str], workers: int) -> list[float]:
+    """Score titles in contiguous chunks across worker processes; order is preserved."""
+    size = -(-len(titles) // workers)
+    chunks = [titles[i : i + size] for i in range(0, len(titles), size)]
+    with ProcessPoolExecutor(max_workers=len(chunks)) as ex:
+        return [sc for part in ex.map(_vader_chunk, chunks) for sc in part]
+
+
+def _vader_workers() -> int:
+    """Process count for large VADER batches: VADER_WORKERS if set (1 = serial), else all cores."""
+    try:
+        return max(1, int(os.environ.get("VADER_WORKERS", "") or (os.cpu_count() or 1)))
+    except ValueError:
+        return os.cpu_count() or 1
 
 
 def _score_vader(headlines: list[dict]) -> list[float]:
-    """Score each headline with VADER compound; return list in [-1, 1] (compound is already -1..1)."""
-    analyzer = _get_vader()
-    if analyzer is None:
+    """
+    Score each headline with VADER compound; return list in [-1, 1] (compound is already -1..1).
+    Duplicate titles are scored once; large batches are spread across CPU cores.
+    """
+    if _get_vader() is None:
         return []
-    scores = []
-    for h in headlines:
-        title = (h.get("title") or "").strip()
-        if not title:
-            scores.append(0.0)
-            continue
+    titles, pos = _unique_titles(headlines)
+    workers = _vader_workers()
+    title_scores = None
+    if len(titles) >= VADER_PARALLEL_MIN and workers > 1:
         try:
-            compound = analyzer.polarity_scores(title).get("compound", 0.0)
-            scores.append(float(compound))
-        except Exception:
-            scores.append(0.0)
+            title_scores = _vader_parallel(titles, workers)
+        except Exception as e:
+            logger.warning("Parallel VADER scoring failed, scoring serially: %s", e)
+    if title_scores is None:
+        title_scores = _vader_chunk(titles)
+    return [title_scores[p] if p >= 0 else 0.0 for p in pos]
+
+
+def _score_cascade(headlines: list[dict]) -> list[float]:
+    """
+    VADER first; headlines with |compound| <= CASCADE_VADER_THRESHOLD are rescored by FinBERT.
+    Falls back to plain FinBERT without VADER, and keeps the VADER scores without FinBERT.
+    """
+    scores = _score_vader(headlines)
+    if not scores:
+        return _score_finbert(headlines)
+    unsure = [i for i, sc in enumerate(scores) if abs(sc) <= CASCADE_VADER_THRESHOLD]
+    finbert = _score_finbert([headlines[i] for i in unsure]) if unsure else []
+    for i, sc in zip(unsure, finbert):
+        scores[i] = sc
+    logger.info("Cascade sentiment: %d of %d headlines rescored by FinBERT", len(finbert), len(scores))
+    return scores
+
+
+def score_headline_values(headlines: list[dict], model_preference: str = "auto") -> list[float]:
+    """
+    Unrounded per-headline scores in [-1, 1] (FinBERT, VADER fallback as in score_headlines);
+    empty if no model is available. Lets callers score many headline groups in one batch.
+    """
+    if not headlines:
+        return []
+    if model_preference == "vader":
+        return _score_vader(headlines)
+    if model_preference == "cascade":
+        return _score_cascade(headlines)
+    scores = _score_finbert(headlines)
+    if not scores and model_preference == "auto":
+        scores = _score_vader(headlines)
     return scores
 
 
@@ -183,7 +660,8 @@ def score_headlines(
     model_preference: str = "auto",
 ) -> dict:
     """
-    Compute sentiment per headline. Try FinBERT first unless model_preference=="vader".
+    Compute sentiment per headline. Try FinBERT first unless model_preference=="vader";
+    "cascade" runs VADER and sends only its uncertain headlines to FinBERT.
     Returns dict with sentiment_mean, sentiment_std, sentiment_count, headline_scores,
     top_positive, top_negative; optional "warning" if no API key / no headlines.
     """
@@ -199,41 +677,37 @@ def score_headlines(
         result["warning"] = "No headlines provided (missing API key or empty fetch)."
         return result
 
-    if model_preference == "vader":
-        scores = _score_vader(headlines)
-    else:
-        scores = _score_finbert(headlines)
-        if not scores and model_preference == "auto":
-            scores = _score_vader(headlines)
-
+    scores = score_headline_values(headlines, model_preference)
     if not scores:
         result["warning"] = "Could not compute sentiment (FinBERT and VADER unavailable)."
         result["sentiment_count"] = len(headlines)
         return result
 
-    import math
     n = len(scores)
+    # builtin sum() keeps the mean bit-identical to the sequential sum it always used
     mean = sum(scores) / n
-    variance = sum((x - mean) ** 2 for x in scores) / n if n else 0
-    std = math.sqrt(variance) if variance > 0 else 0.0
-
+    std = float(np.sqrt(np.mean(np.square(np.asarray(scores, dtype=np.float64) - mean))))
     result["sentiment_mean"] = round(mean, 4)
     result["sentiment_std"] = round(std, 4)
     result["sentiment_count"] = n
 
-    headline_scores = []
-    for h, sc in zip(headlines, scores):
-        headline_scores.append({
+    # Python round() per score: np.round breaks .5 ties differently
+    rounded = [round(sc, 4) for sc in scores]
+    headline_scores = [
+        {
             "title": h.get("title", ""),
-            "score": round(sc, 4),
+            "score": sc,
             "source": h.get("source", ""),
             "publishedAt": h.get("publishedAt", ""),
             "url": h.get("url", ""),
-        })
+        }
+        for h, sc in zip(headlines, rounded)
+    ]
     result["headline_scores"] = headline_scores
 
-    sorted_by_score = sorted(headline_scores, key=lambda x: x["score"], reverse=True)
-    result["top_positive"] = sorted_by_score[:3]
-    result["top_negative"] = sorted_by_score[-3:][::-1]
+    # Stable descending order (ties keep headline order), as sorted(..., reverse=True) did
+    order = np.argsort(-np.asarray(rounded), kind="stable")
+    result["top_positive"] = [headline_scores[i] for i in order[:3]]
+    result["top_negative"] = [headline_scores[i] for i in order[-3:][::-1]]
 
     return result
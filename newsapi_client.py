@@ -8,20 +8,29 @@ Run directly to test and inspect headlines:
 """
 import argparse
 import csv
+import io
 import logging
 import os
 import re
+import sqlite3
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
+import requests
+
 logger = logging.getLogger(__name__)
 
 # Local CSV cache for NewsAPI headlines (minimizes API credits)
 CACHE_PATH = Path(__file__).resolve().parent / "newsapi_headlines.csv"
+# SQLite index over the CSV for per-query lookups (rebuilt from the CSV as needed)
+CACHE_DB_PATH = CACHE_PATH.with_suffix(".db")
 
 # Companies/queries across main sectors (for --sectors flag). 400 queries = 400 tokens = ~40k articles.
-SECTOR_QUERIES = [
+# Read-only tuple of interned strings: the same objects are reused as cache keys.
+SECTOR_QUERIES = tuple(map(sys.intern, [
     # Technology (60)
     "Apple AAPL", "Microsoft MSFT", "Google Alphabet GOOGL", "NVIDIA NVDA", "Meta META", "Amazon AMZN", "Tesla TSLA",
     "Adobe ADBE", "Salesforce CRM", "Oracle ORCL", "Cisco CSCO", "IBM IBM", "Intel INTC", "AMD AMD", "Qualcomm QCOM",
@@ -115,32 +124,180 @@ SECTOR_QUERIES = [
     "Simon Property SPG", "Welltower WELL", "Ventas VTR", "Digital Realty DLR", "Crown Castle CCI",
     "CBRE CBRE", "Jones Lang LaSalle JLL", "Costar CSGP", "Zillow Z",
     "housing market", "commercial real estate", "copper gold metals",
-]
+]))
 
-# Use first 400 queries when --sectors (400 tokens = 40k articles)
+# Use first 400 queries when --sectors (400 tokens = 40k articles); the full list has more
 SECTOR_QUERIES_400 = SECTOR_QUERIES[:400]
 
+ER_ARTICLES_URL = "https://eventregistry.org/api/v1/article/getArticles"
+_thread_local = threading.local()
+
+# Splits "A OR B OR C" queries into terms
+_OR_RE = re.compile(r"\s+OR\s+", re.IGNORECASE)
+
+# Serializes cache reads/appends when queries are fetched from several threads
+_CACHE_LOCK = threading.Lock()
+_cache_db: sqlite3.Connection | None = None
+
+
+def _get_cache_db() -> sqlite3.Connection:
+    """
+    Open (once) the SQLite headline index. Rows are keyed by (query, url or title);
+    re-inserting a key moves it to the end, so rowid order matches the CSV's
+    "latest occurrence wins" order. meta.csv_offset is how many CSV bytes are indexed.
+    """
+    global _cache_db
+    if _cache_db is None:
+        conn = sqlite3.connect(CACHE_DB_PATH, check_same_thread=False)
+        conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS headlines (
+                query TEXT NOT NULL,
+                ukey TEXT NOT NULL,
+                title TEXT NOT NULL,
+                source TEXT NOT NULL,
+                publishedAt TEXT NOT NULL,
+                url TEXT NOT NULL,
+                fetched_at TEXT NOT NULL,
+                PRIMARY KEY (query, ukey)
+            );
+            CREATE INDEX IF NOT EXISTS idx_headlines_q_t ON headlines(query, fetched_at DESC);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        """)
+        conn.commit()
+        _cache_db = conn
+    return _cache_db
+
+
+# Indexed fetched_at for rows the old CSV scan treated specially: a blank timestamp
+# always counted as fresh, an unparseable (or tz-naive) one was always skipped
+_UNDATED = "9999-12-31T23:59:59.999999+00:00"
+_UNPARSEABLE = "0000-01-01T00:00:00+00:00"
+
+
+def _normalize_fetched_at(ft: str) -> str:
+    """
+    fetched_at as a UTC isoformat string (comparable as text). Blank -> _UNDATED
+    (passes any cutoff); unparseable or without a UTC offset -> _UNPARSEABLE (fails it).
+    """
+    if not ft:
+        return _UNDATED
+    # Rows written by this module are already datetime.now(timezone.utc).isoformat()
+    if ft.endswith("+00:00") and len(ft) in (25, 32) and ft[10] == "T":
+        return ft
+    try:
+        dt = datetime.fromisoformat(ft.replace("Z", "+00:00"))
+    except (ValueError, TypeError):
+        return _UNPARSEABLE
+    if dt.tzinfo is None:
+        return _UNPARSEABLE
+    return dt.astimezone(timezone.utc).isoformat()
+
+
+def _sync_cache_db(conn: sqlite3.Connection) -> bool:
+    """
+    Index CSV rows appended since the last sync (by this module or by other
+    scrapers writing the same file). Rebuilds from scratch if the CSV shrank.
+    Returns False if there is no CSV cache at all.
+    """
+    try:
+        size = CACHE_PATH.stat().st_size
+    except FileNotFoundError:
+        return False
+    row = conn.execute("SELECT value FROM meta WHERE key = 'csv_offset'").fetchone()
+    offset = row[0] if row else 0
+    if size == offset:
+        return True
+    if size < offset:
+        conn.execute("DELETE FROM headlines")
+        offset = 0
+    with open(CACHE_PATH, "rb") as f:
+        header = next(csv.reader(io.StringIO(f.readline().decode("utf-8"))), [])
+        if offset:
+            f.seek(offset)
+        text = f.read(size - f.tell()).decode("utf-8")
+    records = []
+    for row in csv.DictReader(io.StringIO(text, newline=""), fieldnames=header):
+        query = row.get("query")
+        ukey = row.get("url") or row.get("title") or ""
+        fetched_at = _normalize_fetched_at(row.get("fetched_at") or "")
+        if query is None or not ukey:
+            continue
+        records.append((
+            query, ukey, row.get("title") or "", row.get("source") or "",
+            row.get("publishedAt") or "", row.get("url") or "", fetched_at,
+        ))
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO headlines (query, ukey, title, source, publishedAt, url, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            records,
+        )
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('csv_offset', ?)", (size,))
+    return True
+
+
+CACHE_COLUMNS = ["query", "title", "source", "publishedAt", "url", "fetched_at"]
+_cache_writer: "CsvCacheWriter | None" = None
+
+
+class CsvCacheWriter:
+    """
+    Keeps the CSV cache open for a batch run: `with CsvCacheWriter(): ...`.
+    While active, save_headlines_to_csv writes through it instead of reopening the
+    file per fetch. Each batch is written and flushed as a whole, so the SQLite
+    index never sees a partial row.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or CACHE_PATH
+        self._f = None
+
+    def __enter__(self) -> "CsvCacheWriter":
+        global _cache_writer
+        self._f = open(self.path, "a", newline="", encoding="utf-8", buffering=1 << 20)
+        _cache_writer = self
+        return self
+
+    def __exit__(self, *exc) -> None:
+        global _cache_writer
+        _cache_writer = None
+        with _CACHE_LOCK:
+            self._f.close()
+
+    def write(self, headlines: list[dict], query: str) -> None:
+        """Append one fetch's headlines (under the cache lock)."""
+        with _CACHE_LOCK:
+            _write_cache_rows(self._f, headlines, query)
+            self._f.flush()
+
+
+def _write_cache_rows(f, headlines: list[dict], query: str) -> None:
+    """Write headlines as cache rows to an append-mode file, header first if it is empty."""
+    fetched_at = datetime.now(timezone.utc).isoformat()
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    if f.tell() == 0:
+        w.writerow(CACHE_COLUMNS)
+    w.writerows(
+        [query, h.get("title", ""), h.get("source", ""), h.get("publishedAt", ""), h.get("url", ""), fetched_at]
+        for h in headlines
+    )
+    f.write(buf.getvalue())
+
 
 def save_headlines_to_csv(headlines: list[dict], query: str) -> None:
     """Append NewsAPI headlines to local CSV cache. Called after every successful API fetch."""
     if not headlines:
         return
     try:
-        write_header = not CACHE_PATH.exists()
-        fetched_at = datetime.now(timezone.utc).isoformat()
-        with open(CACHE_PATH, "a", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            if write_header:
-                w.writerow(["query", "title", "source", "publishedAt", "url", "fetched_at"])
-            for h in headlines:
-                w.writerow([
-                    query,
-                    h.get("title", ""),
-                    h.get("source", ""),
-                    h.get("publishedAt", ""),
-                    h.get("url", ""),
-                    fetched_at,
-                ])
+        writer = _cache_writer
+        if writer is not None and writer.path == CACHE_PATH:
+            writer.write(headlines, query)
+        else:
+            with _CACHE_LOCK, open(CACHE_PATH, "a", newline="", encoding="utf-8") as f:
+                _write_cache_rows(f, headlines, query)
         logger.info("Saved %d headlines to %s", len(headlines), CACHE_PATH)
     except Exception as e:
         logger.warning("Could not save headlines to CSV: %s", e)
@@ -149,49 +306,63 @@ def save_headlines_to_csv(headlines: list[dict], query: str) -> None:
 def load_headlines_from_csv(query: str, n: int, max_age_hours: float = 24.0) -> list[dict] | None:
     """
     Load cached headlines for the given query if we have recent data.
+    Looks up the SQLite index (synced from the CSV first).
     Returns list of dicts or None if cache miss.
     """
-    if not CACHE_PATH.exists():
-        return None
     try:
-        cutoff = datetime.now(timezone.utc) - timedelta(hours=max_age_hours)
-        rows = []
-        with open(CACHE_PATH, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row.get("query") != query:
-                    continue
-                try:
-                    ft = row.get("fetched_at", "")
-                    if ft:
-                        dt = datetime.fromisoformat(ft.replace("Z", "+00:00"))
-                        if dt < cutoff:
-                            continue
-                except (ValueError, TypeError):
-                    continue
-                rows.append({
-                    "title": row.get("title", ""),
-                    "source": row.get("source", ""),
-                    "publishedAt": row.get("publishedAt", ""),
-                    "url": row.get("url", ""),
-                })
+        cutoff = (datetime.now(timezone.utc) - timedelta(hours=max_age_hours)).isoformat()
+        with _CACHE_LOCK:
+            conn = _get_cache_db()
+            if not _sync_cache_db(conn):
+                return None
+            rows = conn.execute(
+                "SELECT title, source, publishedAt, url FROM headlines "
+                "WHERE query = ? AND fetched_at >= ? ORDER BY rowid LIMIT ?",
+                (query, cutoff, max(n, 0)),
+            ).fetchall()
         if not rows:
             return None
-        # Dedupe by url, keep most recent by publishedAt
-        seen = set()
-        unique = []
-        for r in reversed(rows):
-            u = r.get("url") or r.get("title", "")
-            if u and u not in seen:
-                seen.add(u)
-                unique.append(r)
-        unique.reverse()
-        return unique[:n]
+        return [{"title": t, "source": s, "publishedAt": p, "url": u} for t, s, p, u in rows]
     except Exception as e:
         logger.warning("Could not load headlines from CSV: %s", e)
         return None
 
 
+def _er_session() -> requests.Session:
+    """Per-thread keep-alive session for Event Registry calls (reuses TLS connections across queries)."""
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        _thread_local.session = session
+    return session
+
+
+def _get_articles(terms: list[str], api_key: str) -> dict:
+    """
+    One getArticles request for any of terms: the same query the eventregistry SDK
+    builds for QueryArticles(keywords=QueryItems.OR(terms), lang="eng") with
+    RequestArticlesInfo(page=1, count=100, sortBy="date", sortByAsc=False).
+    100 articles per search = 1 token.
+    """
+    payload = {
+        "action": "getArticles",
+        "keyword": terms,
+        "keywordOper": "or",
+        "keywordLoc": "body",
+        "lang": "eng",
+        "dataType": ["news"],
+        "resultType": "articles",
+        "articlesPage": 1,
+        "articlesCount": 100,
+        "articlesSortBy": "date",
+        "articlesSortByAsc": False,
+        "apiKey": api_key,
+    }
+    resp = _er_session().post(ER_ARTICLES_URL, json=payload, timeout=30)
+    resp.raise_for_status()
+    return resp.json()
+
+
 def fetch_headlines(
     query: str,
     api_key: str,
@@ -217,22 +388,15 @@ def fetch_headlines(
         return []
 
     try:
-        from eventregistry import EventRegistry, QueryArticles, RequestArticlesInfo, QueryItems
-
-        er = EventRegistry(apiKey=api_key)
-        # Explicitly request 100 articles per API call (NewsAPI.ai: 100 per search = 1 token)
-        req_info = RequestArticlesInfo(page=1, count=100, sortBy="date", sortByAsc=False)
-        # Parse "A OR B OR C" into QueryItems.OR; add broad fallback to ensure we hit 100 per call
+        # Parse "A OR B OR C" into OR'ed keywords; add broad fallback to ensure we hit 100 per call
         FALLBACK_TERMS = ("stock market", "business news")  # broad terms to fill when query is thin
-        parts = re.split(r"\s+OR\s+", query, flags=re.IGNORECASE)
+        parts = _OR_RE.split(query)
         if len(parts) > 1:
             orig_terms = [t.strip() for t in parts if t.strip()]
             terms = orig_terms + list(FALLBACK_TERMS) if len(orig_terms) > 1 else [query] + list(FALLBACK_TERMS)
         else:
             terms = [query] + list(FALLBACK_TERMS)
-        keywords = QueryItems.OR(terms)
-        q = QueryArticles(keywords=keywords, lang="eng", requestedResult=req_info)
-        res = er.execQuery(q)
+        res = _get_articles(terms, api_key)
         if "error" in res:
             logger.error("Event Registry error: %s", res["error"])
             return []
@@ -282,6 +446,20 @@ def fetch_headlines(
         return []
 
 
+def _print_headlines(query: str, headlines: list[dict]) -> None:
+    """Print a short preview (first 5) of one query's headlines."""
+    if not headlines:
+        print(f"  No headlines returned for '{query}'", file=sys.stderr)
+        return
+    print(f"  Got {len(headlines)} headlines")
+    for i, h in enumerate(headlines[:5], 1):  # show first 5
+        title = (h.get("title") or "(no title)").replace("\n", " ")[:70]
+        source = h.get("source", "")
+        print(f"    {i}. [{source}] {title}...")
+    if len(headlines) > 5:
+        print(f"    ... and {len(headlines) - 5} more")
+
+
 def main() -> int:
     """CLI entrypoint: fetch headlines and print them for testing."""
     logging.basicConfig(
@@ -300,6 +478,7 @@ def main() -> int:
     parser.add_argument("--n", type=int, default=100, help="Number of headlines per query (NewsAPI.ai allows up to 100)")
     parser.add_argument("--no-cache", action="store_true", help="Force API fetch (ignore cache)")
     parser.add_argument("--cache-hours", type=float, default=24.0, help="Cache validity in hours")
+    parser.add_argument("--workers", type=int, default=20, help="Queries fetched concurrently")
     args = parser.parse_args()
 
     api_key = os.environ.get("NEWS_API_KEY", "").strip()
@@ -315,10 +494,8 @@ def main() -> int:
     else:
         queries = [args.query]
 
-    total = 0
-    for qi, query in enumerate(queries, 1):
-        print(f"\n[{qi}/{len(queries)}] Fetching: {query}")
-        headlines = fetch_headlines(
+    def fetch(query: str) -> list[dict]:
+        return fetch_headlines(
             query=query,
             api_key=api_key,
             n=args.n,
@@ -326,18 +503,21 @@ def main() -> int:
             cache_max_age_hours=args.cache_hours,
         )
 
-        if not headlines:
-            print(f"  No headlines returned for '{query}'", file=sys.stderr)
-            continue
-
-        total += len(headlines)
-        print(f"  Got {len(headlines)} headlines")
-        for i, h in enumerate(headlines[:5], 1):  # show first 5
-            title = (h.get("title") or "(no title)").replace("\n", " ")[:70]
-            source = h.get("source", "")
-            print(f"    {i}. [{source}] {title}...")
-        if len(headlines) > 5:
-            print(f"    ... and {len(headlines) - 5} more")
+    # Each query is an independent HTTP round-trip; run them concurrently and
+    # report in query order as results arrive
+    total = 0
+    with CsvCacheWriter(), ThreadPoolExecutor(max_workers=max(1, args.workers)) as ex:
+        results = ex.map(fetch, queries)
+        try:
+            for qi, (query, headlines) in enumerate(zip(queries, results), 1):
+                print(f"\n[{qi}/{len(queries)}] Fetched: {query}")
+                _print_headlines(query, headlines)
+                total += len(headlines)
+        except BaseException:
+            # Ctrl-C: drop queued queries (each one is a paid API call); only
+            # requests already in flight finish
+            ex.shutdown(wait=False, cancel_futures=True)
+            raise
 
     print(f"\n--- Total: {total} headlines across {len(queries)} query/queries ---")
     return 0 if total > 0 else 1
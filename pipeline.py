@@ -7,13 +7,10 @@ import logging
 import os
 import sys
 
-import numpy as np
-import pandas as pd
-
-from market_data import get_spot, get_options_chain
-from news_sentiment import fetch_headlines, score_headlines
-from rss_sentiment import get_ticker_sentiment, get_rolling_sentiment
-from scoring import compute_scores
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logging.basicConfig(
     level=logging.INFO,
@@ -47,9 +44,10 @@ def main() -> int:
     parser.add_argument("--headlines", type=int, default=100, help="Number of headlines to fetch (NewsAPI.ai: up to 100 per search)")
     parser.add_argument("--headlines_csv", type=str, default="",
                         help="Load headlines from CSV file instead of fetching (e.g. newsapi_headlines_dummy.csv)")
-    parser.add_argument("--no-cache", action="store_true", help="Force NewsAPI fetch (ignore local CSV cache)")
+    parser.add_argument("--no-cache", action="store_true", help="Force fresh data: ignore the NewsAPI CSV cache and saved spot/options sidecars")
     parser.add_argument("--cache-hours", type=float, default=24.0, help="NewsAPI cache validity in hours (default: 24)")
-    parser.add_argument("--model", type=str, default="auto", choices=["auto", "vader"], help="Sentiment model")
+    parser.add_argument("--model", type=str, default="auto", choices=["auto", "vader", "cascade"],
+                        help="Sentiment model: auto (FinBERT, VADER fallback), vader, or cascade (VADER, FinBERT for uncertain headlines)")
     parser.add_argument("--rss-weight", type=float, default=0.25, help="Weight for RSS/social sentiment (0-1); rest is news (default 0.25)")
     parser.add_argument("--rss-hours", type=int, default=24, help="RSS sentiment rolling window in hours (default 24)")
     parser.add_argument("--no-rss", action="store_true", help="Disable RSS/social sentiment (use news only)")
@@ -61,6 +59,16 @@ def main() -> int:
         logger.error("Ticker is required")
         return 1
 
+    # Heavy imports (pandas, yfinance, numba, sentiment stack) only once there is work to do,
+    # so --help and argument errors return immediately
+    import market_data
+    from market_data import get_spot, get_options_chain
+    from news_sentiment import fetch_headlines, load_headlines_csv, score_headlines
+    from rss_sentiment import blend_sentiment, get_ticker_sentiment, get_rolling_sentiment
+    from scoring import compute_scores, top_by_abs_score
+    if args.no_cache:
+        market_data.READ_DISK_CACHE = False
+
     # 1) Spot + options chain
     logger.info("Fetching spot and options chain for %s", ticker)
     try:
@@ -79,19 +87,9 @@ def main() -> int:
     # 2) Headlines + sentiment (NewsAPI, Yahoo Finance, or CSV file)
     api_key = os.environ.get("NEWS_API_KEY", "").strip()
     if args.headlines_csv.strip():
-        import csv
         csv_path = args.headlines_csv.strip()
-        headlines = []
         try:
-            with open(csv_path, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    headlines.append({
-                        "title": row.get("title", ""),
-                        "source": row.get("source", ""),
-                        "publishedAt": row.get("publishedAt", ""),
-                        "url": row.get("url", ""),
-                    })
+            headlines = load_headlines_csv(csv_path)
             logger.info("Loaded %d headlines from %s", len(headlines), csv_path)
         except Exception as e:
             logger.exception("Failed to load headlines from CSV: %s", e)
@@ -117,9 +115,11 @@ def main() -> int:
     if not args.no_rss and args.rss_weight > 0:
         rss_sent = get_ticker_sentiment(ticker, hours=args.rss_hours) or get_rolling_sentiment(args.rss_hours)
         if rss_sent is not None:
-            w = max(0.0, min(1.0, args.rss_weight))
-            sentiment_mean = (1 - w) * news_sentiment + w * rss_sent
-            logger.info("Sentiment: news=%.4f, rss=%.4f (weight=%.2f) -> combined=%.4f", news_sentiment, rss_sent, w, sentiment_mean)
+            sentiment_mean = blend_sentiment(news_sentiment, rss_sent, args.rss_weight)
+            logger.info(
+                "Sentiment: news=%.4f, rss=%.4f (weight=%.2f) -> combined=%.4f",
+                news_sentiment, rss_sent, max(0.0, min(1.0, args.rss_weight)), sentiment_mean,
+            )
         else:
             logger.debug("No RSS sentiment for %s (rss_sentiment.db empty or no data)", ticker)
     sentiment_result["sentiment_mean"] = sentiment_mean
@@ -138,40 +138,42 @@ def main() -> int:
         "lastPrice", "bid", "ask", "mid_price", "impliedVolatility", "opportunity_score",
     ]
     out_cols = [c for c in out_cols if c in scored_df.columns]
-    out_df = scored_df[out_cols].copy()
-    if "expiration" in out_df.columns and len(out_df) and hasattr(out_df["expiration"].iloc[0], "isoformat"):
-        out_df["expiration"] = out_df["expiration"].astype(str)
-    out_df.to_csv(csv_path, index=False)
+    # Written straight from scored_df; to_csv formats expiration like str(Timestamp)
+    scored_df.to_csv(csv_path, columns=out_cols, index=False)
     logger.info("Wrote %s", csv_path)
 
     # 5) Simplified CSV: optiontype, price, strike, score (top 100 by |opportunity_score|)
     if "opportunity_score" in scored_df.columns:
-        simple = (
-            scored_df.assign(_abs=np.abs(scored_df["opportunity_score"]))
-            .nlargest(100, "_abs")
-            .drop(columns=["_abs"], errors="ignore")
-        )
-        simple_csv = simple[["option_type", "mid_price", "strike", "opportunity_score"]].copy()
-        simple_csv.columns = ["optiontype", "price", "strike", "score"]
+        simple = top_by_abs_score(scored_df, 100)
         simple_path = f"output_{ticker}_simple.csv"
-        simple_csv.to_csv(simple_path, index=False)
+        simple.to_csv(
+            simple_path,
+            columns=["option_type", "mid_price", "strike", "opportunity_score"],
+            header=["optiontype", "price", "strike", "score"],
+            index=False,
+        )
         logger.info("Wrote %s", simple_path)
 
     # JSON sentiment
     json_path = f"sentiment_{ticker}.json"
-    with open(json_path, "w") as f:
-        json.dump(sentiment_result, f, default=_serialize_for_json, indent=2)
+    if orjson is not None:
+        # Native numpy/datetime support; NaN becomes null
+        with open(json_path, "wb") as f:
+            f.write(orjson.dumps(
+                sentiment_result,
+                default=_serialize_for_json,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+            ))
+    else:
+        with open(json_path, "w") as f:
+            json.dump(sentiment_result, f, default=_serialize_for_json, indent=2)
     logger.info("Wrote %s", json_path)
 
     # Top 15 by abs(opportunity_score)
     if "opportunity_score" not in scored_df.columns:
         logger.warning("No opportunity_score column")
         return 0
-    top = (
-        scored_df.assign(_abs=np.abs(scored_df["opportunity_score"]))
-        .nlargest(15, "_abs")
-        .drop(columns=["_abs"], errors="ignore")
-    )
+    top = top_by_abs_score(scored_df, 15)
     cols_show = [
         "contractSymbol", "option_type", "strike", "expiration",
         "mid_price", "theo_price", "pricing_gap_pct", "opportunity_score", "risk_flag",
@@ -180,8 +182,6 @@ def main() -> int:
     print("\n--- Top 15 opportunities by |opportunity_score| ---")
     print(top[cols_show].to_string(index=False))
 
-    
-
     return 0
 
 
@@ -7,13 +7,14 @@ import argparse
 import csv
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
-import numpy as np
+import pandas as pd
 
 from market_data import get_spot, get_options_chain
-from news_sentiment import score_headlines, fetch_headlines_yahoo
-from rss_sentiment import get_ticker_sentiment, get_rolling_sentiment
-from scoring import compute_scores
+from news_sentiment import score_headlines, score_headline_values, fetch_headlines_yahoo, load_headlines_csv
+from rss_sentiment import blend_sentiment, get_ticker_sentiments, get_rolling_sentiment
+from scoring import OUTPUT_COLS, compute_scores, output_rows, top_by_abs_score
 
 logging.basicConfig(
     level=logging.INFO,
@@ -29,7 +30,86 @@ DEFAULT_TICKERS = [
     "HD", "DIS", "NFLX", "ADBE", "CRM", "INTC", "AMD", "GS", "BA", "CAT",
 ]
 
-OUTPUT_COLS = ["ticker", "expiration", "contractSymbol", "strike", "price", "bid", "midPrice", "score", "impliedVolatility"]
+def _score_one_ticker(
+    ticker: str,
+    args: argparse.Namespace,
+    news_sentiment: float,
+    rss_sent: float | None = None,
+    ticker_news: float | None = None,
+) -> list[dict]:
+    """
+    Fetch spot + options for one ticker, blend its sentiment, score, and return its top output rows.
+    rss_sent is the ticker's RSS sentiment (or the rolling fallback) and ticker_news its own
+    headlines' sentiment (--per-ticker-news); both are looked up once in main.
+    """
+    spot = get_spot(ticker)
+    if spot != spot or spot <= 0:
+        logger.warning("No spot for %s, skipping", ticker)
+        return []
+    options_df = get_options_chain(ticker, max_expirations=args.expirations)
+    if options_df is None or options_df.empty:
+        logger.warning("No options for %s, skipping", ticker)
+        return []
+    # Per-ticker sentiment: optional ticker-specific news, then blend with global + RSS
+    sentiment_mean = news_sentiment
+    if ticker_news is not None:
+        sentiment_mean = 0.7 * ticker_news + 0.3 * news_sentiment
+        logger.info("%s: per-ticker news sentiment %.4f (blended with global)", ticker, sentiment_mean)
+    sentiment_mean = blend_sentiment(sentiment_mean, rss_sent, args.rss_weight)
+    scored_df = compute_scores(
+        options_df, spot, args.r, sentiment_mean,
+        sentiment_weight=getattr(args, "sentiment_weight", 1.0),
+    )
+    if "opportunity_score" not in scored_df.columns:
+        return []
+    top = top_by_abs_score(scored_df, args.top_per_ticker)
+    logger.info("%s: %d options", ticker, len(top))
+    return output_rows(ticker, top)
+
+
+def _per_ticker_news(tickers: list[str], n: int, max_workers: int) -> dict[str, float]:
+    """
+    Sentiment mean of each ticker's own Yahoo headlines (tickers without headlines are omitted).
+    Fetches run concurrently; all headlines are then scored in one batch and split per ticker.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as ex:
+        fetched = dict(zip(tickers, ex.map(lambda t: fetch_headlines_yahoo(t, n=n), tickers)))
+    flat = [h for t in tickers for h in fetched[t]]
+    scores = score_headline_values(flat, model_preference="auto")
+    out = {}
+    start = 0
+    for t in tickers:
+        count = len(fetched[t])
+        if not count:
+            continue
+        part = scores[start : start + count]
+        start += count
+        # Same as score_headlines(...)["sentiment_mean"]; 0.0 when no model is available
+        out[t] = round(sum(part) / count, 4) if part else 0.0
+    return out
+
+
+def _iter_ticker_rows(
+    tickers: list[str],
+    args: argparse.Namespace,
+    news_sentiment: float,
+    rss_by_ticker: dict,
+    news_by_ticker: dict,
+):
+    """
+    Yield (ticker, rows) in ticker order for tickers that produced rows. Per-ticker work
+    is dominated by blocking Yahoo calls, so tickers run ahead on a thread pool.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, args.max_workers)) as ex:
+        futures = [ex.submit(_score_one_ticker, t, args, news_sentiment, rss_by_ticker.get(t), news_by_ticker.get(t)) for t in tickers]
+        for ticker, fut in zip(tickers, futures):
+            try:
+                rows = fut.result()
+            except Exception as e:
+                logger.warning("%s failed: %s", ticker, e)
+                continue
+            if rows:
+                yield ticker, rows
 
 
 def main() -> int:
@@ -47,20 +127,22 @@ def main() -> int:
     parser.add_argument("--per-ticker-news", action="store_true", help="Fetch ticker-specific headlines (Yahoo) per ticker for nuanced sentiment; slower")
     parser.add_argument("--per-ticker-news-n", type=int, default=25, help="Headlines per ticker when using --per-ticker-news (default 25)")
     parser.add_argument("--sentiment-weight", type=float, default=1.0, help="Weight for sentiment vs mispricing (1.0 = sentiment only; bearish -> favor puts)")
+    parser.add_argument("--max-workers", type=int, default=8, help="Tickers processed concurrently (default 8)")
+    parser.add_argument("--output-format", type=str, default="", choices=["", "csv", "parquet"],
+                        help="csv or parquet (default: parquet if --output ends in .parquet, else csv)")
     args = parser.parse_args()
 
+    output_format = args.output_format or ("parquet" if args.output.lower().endswith(".parquet") else "csv")
+    if output_format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            logger.error("Parquet output requires pyarrow (pip install pyarrow)")
+            return 1
+
     # Load headlines
-    headlines = []
     try:
-        with open(args.headlines_csv, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                headlines.append({
-                    "title": row.get("title", ""),
-                    "source": row.get("source", ""),
-                    "publishedAt": row.get("publishedAt", ""),
-                    "url": row.get("url", ""),
-                })
+        headlines = load_headlines_csv(args.headlines_csv)
     except Exception as e:
         logger.exception("Failed to load headlines: %s", e)
         return 1
@@ -79,68 +161,40 @@ def main() -> int:
     # Tickers
     tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()] if args.tickers.strip() else DEFAULT_TICKERS
 
-    all_rows = []
-    for ticker in tickers:
-        try:
-            spot = get_spot(ticker)
-            if spot != spot or spot <= 0:
-                logger.warning("No spot for %s, skipping", ticker)
-                continue
-            options_df = get_options_chain(ticker, max_expirations=args.expirations)
-            if options_df is None or options_df.empty:
-                logger.warning("No options for %s, skipping", ticker)
-                continue
-            # Per-ticker sentiment: optional ticker-specific news, then blend with global + RSS
-            sentiment_mean = news_sentiment
-            if getattr(args, "per_ticker_news", False):
-                ticker_headlines = fetch_headlines_yahoo(ticker, n=getattr(args, "per_ticker_news_n", 25))
-                if ticker_headlines:
-                    ticker_result = score_headlines(ticker_headlines, model_preference="auto")
-                    ticker_news = ticker_result.get("sentiment_mean", news_sentiment)
-                    sentiment_mean = 0.7 * ticker_news + 0.3 * news_sentiment
-                    logger.info("%s: per-ticker news sentiment %.4f (blended with global)", ticker, sentiment_mean)
-            if not args.no_rss and args.rss_weight > 0:
-                rss_sent = get_ticker_sentiment(ticker, hours=args.rss_hours) or get_rolling_sentiment(args.rss_hours)
-                if rss_sent is not None:
-                    w = max(0.0, min(1.0, args.rss_weight))
-                    sentiment_mean = (1 - w) * sentiment_mean + w * rss_sent
-            scored_df = compute_scores(
-                options_df, spot, args.r, sentiment_mean,
-                sentiment_weight=getattr(args, "sentiment_weight", 1.0),
-            )
-            if "opportunity_score" not in scored_df.columns:
-                continue
-            top = (
-                scored_df.assign(_abs=np.abs(scored_df["opportunity_score"]))
-                .nlargest(args.top_per_ticker, "_abs")
-                .drop(columns=["_abs"], errors="ignore")
-            )
-            for _, row in top.iterrows():
-                exp = row.get("expiration")
-                if hasattr(exp, "isoformat"):
-                    exp = exp.isoformat()
-                all_rows.append({
-                    "ticker": ticker,
-                    "expiration": str(exp) if exp is not None else "",
-                    "contractSymbol": str(row.get("contractSymbol", "")),
-                    "strike": row.get("strike", ""),
-                    "price": row.get("lastPrice", ""),
-                    "bid": row.get("bid", ""),
-                    "midPrice": row.get("mid_price", ""),
-                    "score": row.get("opportunity_score", ""),
-                    "impliedVolatility": row.get("impliedVolatility", ""),
-                })
-            logger.info("%s: %d options", ticker, len(top))
-        except Exception as e:
-            logger.warning("%s failed: %s", ticker, e)
-
-    # Write output
-    with open(args.output, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=OUTPUT_COLS, extrasaction="ignore")
-        w.writeheader()
-        w.writerows(all_rows)
-
-    logger.info("Wrote %s (%d rows, %d tickers)", args.output, len(all_rows), len(set(r["ticker"] for r in all_rows)))
+    # RSS sentiment for every ticker in one DB pass; rolling market sentiment as fallback
+    rss_by_ticker: dict[str, float | None] = {}
+    if not args.no_rss and args.rss_weight > 0:
+        ticker_rss = get_ticker_sentiments(tickers, hours=args.rss_hours)
+        rolling = get_rolling_sentiment(args.rss_hours)
+        rss_by_ticker = {t: ticker_rss.get(t) or rolling for t in tickers}
+
+    news_by_ticker: dict[str, float] = {}
+    if args.per_ticker_news:
+        news_by_ticker = _per_ticker_news(tickers, args.per_ticker_news_n, args.max_workers)
+
+    results = _iter_ticker_rows(tickers, args, news_sentiment, rss_by_ticker, news_by_ticker)
+    total_rows = 0
+    written_tickers = 0
+    if output_format == "parquet":
+        frames = []
+        for _, rows in results:
+            frames.append(pd.DataFrame(rows, columns=OUTPUT_COLS))
+            total_rows += len(rows)
+            written_tickers += 1
+        out_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=OUTPUT_COLS)
+        out_df.to_parquet(args.output, engine="pyarrow", compression="zstd", index=False)
+    else:
+        # Write each ticker's rows as soon as it (and every ticker before it) is done
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=OUTPUT_COLS, extrasaction="ignore")
+            w.writeheader()
+            for _, rows in results:
+                w.writerows(rows)
+                f.flush()
+                total_rows += len(rows)
+                written_tickers += 1
+
+    logger.info("Wrote %s (%d rows, %d tickers)", args.output, total_rows, written_tickers)
     return 0
 
 
@@ -6,12 +6,16 @@ tickers, stores in SQLite, and prints rolling aggregates.
 Run: python rss_sentiment.py
 """
 
+import hashlib
 import re
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
-from urllib.request import urlopen, Request
 import feedparser
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # -----------------------------------------------------------------------------
 # CONFIGURATION: RSS feed URLs
@@ -35,20 +39,25 @@ USER_AGENT = "Mozilla/5.0 (compatible; RSS-Sentiment-Bot/1.0)"
 # -----------------------------------------------------------------------------
 # Finance-specific and general positive/negative terms. Score contribution
 # is normalized so final score stays in [-1, 1].
-POSITIVE_WORDS = {
+POSITIVE_WORDS = frozenset({
     "bullish", "moon", "mooning", "rally", "rallies", "rallying", "buy", "long",
     "breakout", "breakouts", "surge", "surges", "soar", "soaring", "gain", "gains",
     "profit", "profits", "win", "winning", "growth", "strong", "recovery",
     "optimistic", "bull", "bulls", "green", "call", "calls", "undervalued",
     "breakthrough", "beat", "beats", "beating", "outperform", "upgrade", "upgraded",
-}
-NEGATIVE_WORDS = {
+})
+NEGATIVE_WORDS = frozenset({
     "bearish", "dump", "dumps", "dumping", "crash", "crashes", "crashing",
-    "sell", "short", "shorts", "collapse", "collapse", "plunge", "plunges",
+    "sell", "short", "shorts", "collapse", "plunge", "plunges",
     "drop", "drops", "fall", "falls", "loss", "losses", "bear", "bears",
     "red", "put", "puts", "overvalued", "recession", "fear", "panic",
     "miss", "misses", "missing", "downgrade", "downgraded", "weak", "weakness",
-}
+})
+
+# Patterns used per feed entry, compiled once
+_TAG_RE = re.compile(r"<[^>]+>")
+_WORD_RE = re.compile(r"\b[a-z]+\b")
+_CASHTAG_RE = re.compile(r"\$([A-Z]{1,5})\b", re.IGNORECASE)
 
 # -----------------------------------------------------------------------------
 # DATABASE
@@ -61,36 +70,120 @@ def get_connection():
     return sqlite3.connect(DB_PATH)
 
 
+_INSERT_ITEM_SQL = (
+    "INSERT OR IGNORE INTO items (ts, source, title, sentiment, tickers, h) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_INSERT_TICKER_SQL = "INSERT INTO item_tickers (item_id, ticker) VALUES (?, ?)"
+
+
+def _split_tickers(tickers_str):
+    """Distinct, stripped, uppercase tickers from a comma-separated tickers column."""
+    return list(dict.fromkeys(t for t in (t.strip().upper() for t in tickers_str.split(",")) if t))
+
+
+def _item_hash(source, key):
+    """16-byte BLAKE2b digest of (source, key) identifying an entry across runs."""
+    return hashlib.blake2b(f"{source}|{key}".encode(), digest_size=16).digest()
+
+
 def init_db(conn):
     """
     Create tables if they do not exist.
-    - items: raw RSS items with timestamp, source, title, sentiment, tickers
+    - items: raw RSS items with timestamp, source, title, sentiment, tickers,
+      and h = hash of (source, title) so re-fetched entries are stored once
+      (untitled entries hash their link, or their text if there is no link)
+    - item_tickers: one (item_id, ticker) row per cashtag, for indexed lookups
+    - feed_cache: last ETag / Last-Modified per feed URL for conditional GETs
     - We use ISO timestamp strings for easy rolling window queries.
+    WAL + synchronous=NORMAL keeps the batched insert to a single cheap sync.
     """
     conn.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
         CREATE TABLE IF NOT EXISTS items (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             ts TEXT NOT NULL,
             source TEXT NOT NULL,
             title TEXT NOT NULL,
             sentiment REAL NOT NULL,
-            tickers TEXT NOT NULL
+            tickers TEXT NOT NULL,
+            h BLOB
         );
         CREATE INDEX IF NOT EXISTS idx_items_ts ON items(ts);
         CREATE INDEX IF NOT EXISTS idx_items_tickers ON items(tickers);
+        CREATE TABLE IF NOT EXISTS item_tickers (
+            item_id INTEGER NOT NULL REFERENCES items(id),
+            ticker TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_it_ticker ON item_tickers(ticker, item_id);
+        CREATE TABLE IF NOT EXISTS feed_cache (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            modified TEXT
+        );
     """)
+    # h (content hash) was added later; older rows keep NULL, which UNIQUE allows
+    if "h" not in {row[1] for row in conn.execute("PRAGMA table_info(items)")}:
+        conn.execute("ALTER TABLE items ADD COLUMN h BLOB")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_items_h ON items(h)")
+    # Backfill rows stored before item_tickers existed
+    legacy = conn.execute(
+        "SELECT id, tickers FROM items WHERE tickers != '' AND id > "
+        "(SELECT COALESCE(MAX(item_id), 0) FROM item_tickers)"
+    ).fetchall()
+    conn.executemany(
+        _INSERT_TICKER_SQL,
+        [(item_id, t) for item_id, tickers_str in legacy for t in _split_tickers(tickers_str)],
+    )
     conn.commit()
 
 
-def fetch_rss(url, timeout=15):
+_session = None
+
+
+def get_session():
+    """
+    Shared keep-alive session for feed fetches (several feeds live on the same
+    host, e.g. reddit), with a couple of retries on transient errors.
+    """
+    global _session
+    if _session is None:
+        s = requests.Session()
+        s.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504)),
+        )
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        _session = s
+    return _session
+
+
+def fetch_rss(url, timeout=15, etag=None, modified=None):
     """
     Fetch and parse an RSS/Atom feed. Returns feedparser dict or None on failure.
+    With etag/modified from a previous fetch this is a conditional GET; an
+    unchanged feed (304) also returns None. The response's validators are set
+    on the returned dict as "etag" and "modified".
     """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
     try:
-        req = Request(url, headers={"User-Agent": USER_AGENT})
-        with urlopen(req, timeout=timeout) as resp:
-            data = resp.read()
-        return feedparser.parse(data)
+        resp = get_session().get(url, timeout=timeout, headers=headers)
+        if resp.status_code == 304:
+            return None
+        resp.raise_for_status()
+        feed = feedparser.parse(resp.content)
+        feed["etag"] = resp.headers.get("ETag")
+        feed["modified"] = resp.headers.get("Last-Modified")
+        return feed
     except Exception as e:
         print(f"  [WARN] Failed to fetch {url}: {e}")
         return None
@@ -108,10 +201,11 @@ def extract_text(entry):
     if getattr(entry, "description", None):
         parts.append(entry.description)
     text = " ".join(parts)
-    # Strip HTML tags crudely for sentiment (keep words)
-    text = re.sub(r"<[^>]+>", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    # Strip HTML tags crudely for sentiment (keep words); plain-text entries skip the regex
+    if "<" in text:
+        text = _TAG_RE.sub(" ", text)
+    # split/join collapses the same whitespace as \s+ and trims the ends
+    return " ".join(text.split())
 
 
 def score_sentiment(text):
@@ -123,11 +217,16 @@ def score_sentiment(text):
     if not text:
         return 0.0
     text_lower = text.lower()
-    words = re.findall(r"\b[a-z]+\b", text_lower)
+    words = _WORD_RE.findall(text_lower)
     if not words:
         return 0.0
-    pos_count = sum(1 for w in words if w in POSITIVE_WORDS)
-    neg_count = sum(1 for w in words if w in NEGATIVE_WORDS)
+    # Single pass over the tokens for both lexicons
+    pos_count = neg_count = 0
+    for w in words:
+        if w in POSITIVE_WORDS:
+            pos_count += 1
+        if w in NEGATIVE_WORDS:
+            neg_count += 1
     # Normalize: (pos - neg) / total, then clamp to [-1, 1]
     raw = (pos_count - neg_count) / len(words)
     return max(-1.0, min(1.0, raw * 5.0))  # scale so a few words can move score
@@ -139,31 +238,41 @@ def extract_tickers(text):
     """
     if not text:
         return []
-    matches = re.findall(r"\$([A-Z]{1,5})\b", text, re.IGNORECASE)
+    matches = _CASHTAG_RE.findall(text)
     return list(dict.fromkeys([m.upper() for m in matches]))
 
 
-def store_item(conn, source, title, sentiment, tickers):
-    """Insert one processed item into the database."""
-    ts = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    tickers_str = ",".join(tickers) if tickers else ""
-    conn.execute(
-        "INSERT INTO items (ts, source, title, sentiment, tickers) VALUES (?, ?, ?, ?, ?)",
-        (ts, source, title, sentiment, tickers_str),
-    )
-
-
 def run_pipeline(feed_urls):
     """
     For each feed URL: fetch, parse, extract text, score sentiment, extract
-    tickers, then store each item in SQLite.
+    tickers, then store new items in SQLite in one transaction. Feeds are
+    fetched concurrently; scoring and inserts stay on the calling thread, in
+    feed order. Feeds unchanged since the last run (HTTP 304) are skipped.
     """
+    feed_urls = list(feed_urls)
+    if not feed_urls:
+        return
     conn = get_connection()
     init_db(conn)
     try:
-        for url in feed_urls:
-            feed = fetch_rss(url)
-            if not feed or not feed.entries:
+        validators = {
+            url: (etag, modified)
+            for url, etag, modified in conn.execute("SELECT url, etag, modified FROM feed_cache")
+        }
+        with ThreadPoolExecutor(max_workers=min(16, len(feed_urls))) as pool:
+            futures = []
+            for url in feed_urls:
+                etag, modified = validators.get(url, (None, None))
+                futures.append(pool.submit(fetch_rss, url, etag=etag, modified=modified))
+            feeds = [f.result() for f in futures]
+        ts = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        rows = []
+        cache_rows = []
+        for url, feed in zip(feed_urls, feeds):
+            if not feed:
+                continue
+            cache_rows.append((url, feed.get("etag"), feed.get("modified")))
+            if not feed.entries:
                 continue
             source = feed.feed.get("title", url) or url
             for entry in feed.entries:
@@ -171,8 +280,22 @@ def run_pipeline(feed_urls):
                 title = (getattr(entry, "title", None) or "")[:500]
                 sentiment = score_sentiment(text)
                 tickers = extract_tickers(text)
-                store_item(conn, source, title, sentiment, tickers)
-        conn.commit()
+                # Untitled entries would all share one hash; identify them by link or text
+                key = title or getattr(entry, "link", None) or text
+                rows.append(
+                    (ts, source, title, sentiment, ",".join(tickers), _item_hash(source, key))
+                )
+        with conn:
+            ticker_rows = []
+            for row in rows:
+                cur = conn.execute(_INSERT_ITEM_SQL, row)
+                if cur.rowcount == 1:  # 0 when the entry was already stored
+                    ticker_rows.extend((cur.lastrowid, t) for t in _split_tickers(row[4]))
+            conn.executemany(_INSERT_TICKER_SQL, ticker_rows)
+            conn.executemany(
+                "INSERT OR REPLACE INTO feed_cache (url, etag, modified) VALUES (?, ?, ?)",
+                cache_rows,
+            )
     finally:
         conn.close()
 
@@ -191,6 +314,30 @@ def rolling_sentiment(conn, hours):
     return None
 
 
+def _has_item_tickers(conn):
+    """True once init_db has created (and backfilled) the item_tickers join table."""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'item_tickers'"
+    ).fetchone() is not None
+
+
+def _scan_ticker_averages(conn, since, wanted=None):
+    """
+    Fallback for databases written before item_tickers existed: average sentiment
+    per ticker from the items.tickers column, each item counted once per ticker.
+    Returns {ticker: avg} in first-seen order, optionally limited to `wanted`.
+    """
+    by_ticker = {}
+    for sentiment, tickers_str in conn.execute(
+        "SELECT sentiment, tickers FROM items WHERE ts >= ? AND tickers != '' ORDER BY id",
+        (since,),
+    ):
+        for t in _split_tickers(tickers_str):
+            if wanted is None or t in wanted:
+                by_ticker.setdefault(t, []).append(sentiment)
+    return {t: sum(s) / len(s) for t, s in by_ticker.items()}
+
+
 def per_ticker_sentiment(conn, hours, limit=10):
     """
     For items in the last `hours`, expand tickers and compute average sentiment
@@ -198,21 +345,16 @@ def per_ticker_sentiment(conn, hours, limit=10):
     (ticker, avg_sentiment), sorted by sentiment desc/asc, top `limit`.
     """
     since = (datetime.utcnow() - timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S")
-    rows = conn.execute(
-        "SELECT sentiment, tickers FROM items WHERE ts >= ? AND tickers != ''",
-        (since,),
-    ).fetchall()
-    # ticker -> list of sentiments
-    by_ticker = {}
-    for sentiment, tickers_str in rows:
-        for t in tickers_str.split(","):
-            t = t.strip()
-            if not t:
-                continue
-            by_ticker.setdefault(t, []).append(sentiment)
-    # averages
-    avg = [(t, sum(s) / len(s)) for t, s in by_ticker.items()]
-    avg.sort(key=lambda x: x[1], reverse=True)
+    # ties keep first-seen order, as the old Python-side aggregation did
+    if _has_item_tickers(conn):
+        avg = conn.execute(
+            "SELECT t.ticker, AVG(i.sentiment) AS avg_s FROM items i "
+            "JOIN item_tickers t ON t.item_id = i.id "
+            "WHERE i.ts >= ? GROUP BY t.ticker ORDER BY avg_s DESC, MIN(i.id)",
+            (since,),
+        ).fetchall()
+    else:
+        avg = sorted(_scan_ticker_averages(conn, since).items(), key=lambda kv: -kv[1])
     bullish = avg[:limit]
     bearish = avg[-limit:][::-1]
     return bullish, bearish
@@ -230,25 +372,62 @@ def get_ticker_sentiment(ticker: str, hours: int = 24) -> Optional[float]:
         conn = get_connection()
         try:
             since = (datetime.utcnow() - timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S")
-            rows = conn.execute(
-                "SELECT sentiment, tickers FROM items WHERE ts >= ? AND tickers != ''",
-                (since,),
-            ).fetchall()
-            sentiments = []
-            for sentiment, tickers_str in rows:
-                for t in tickers_str.split(","):
-                    if t.strip().upper() == ticker:
-                        sentiments.append(sentiment)
-                        break
-            if not sentiments:
+            if not _has_item_tickers(conn):
+                avg = _scan_ticker_averages(conn, since, {ticker}).get(ticker)
+                return None if avg is None else round(avg, 4)
+            row = conn.execute(
+                "SELECT AVG(i.sentiment) FROM items i "
+                "JOIN item_tickers t ON t.item_id = i.id "
+                "WHERE t.ticker = ? AND i.ts >= ?",
+                (ticker, since),
+            ).fetchone()
+            if not row or row[0] is None:
                 return None
-            return round(sum(sentiments) / len(sentiments), 4)
+            return round(row[0], 4)
         finally:
             conn.close()
     except Exception:
         return None
 
 
+def get_ticker_sentiments(tickers, hours: int = 24) -> dict:
+    """
+    Average RSS/social sentiment per ticker over the last `hours`, for many tickers
+    with one query (same values as get_ticker_sentiment). Tickers without data are
+    omitted. Safe to call if DB is missing.
+    """
+    wanted = {t.strip().upper() for t in tickers if t and t.strip()}
+    if not wanted:
+        return {}
+    try:
+        conn = get_connection()
+        try:
+            since = (datetime.utcnow() - timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S")
+            if not _has_item_tickers(conn):
+                return {t: round(avg, 4) for t, avg in _scan_ticker_averages(conn, since, wanted).items()}
+            wanted = sorted(wanted)
+            rows = conn.execute(
+                "SELECT t.ticker, AVG(i.sentiment) FROM items i "
+                "JOIN item_tickers t ON t.item_id = i.id "
+                f"WHERE t.ticker IN ({','.join('?' * len(wanted))}) AND i.ts >= ? "
+                "GROUP BY t.ticker",
+                (*wanted, since),
+            ).fetchall()
+            return {t: round(avg, 4) for t, avg in rows}
+        finally:
+            conn.close()
+    except Exception:
+        return {}
+
+
+def blend_sentiment(news: float, rss: Optional[float], weight: float) -> float:
+    """Weighted mix (1 - w) * news + w * rss with w clamped to [0, 1]; news unchanged if rss is None."""
+    if rss is None:
+        return news
+    w = max(0.0, min(1.0, weight))
+    return (1 - w) * news + w * rss
+
+
 def get_rolling_sentiment(hours: int = 24) -> Optional[float]:
     """
     Overall (market) RSS/social sentiment over the last `hours`.
@@ -7,10 +7,30 @@ import logging
 import numpy as np
 import pandas as pd
 
-from bs import bs_price
+from bs_numba import bs_batch
 
 logger = logging.getLogger(__name__)
 
+# Columns of the combined multi-ticker options CSV (see output_rows)
+OUTPUT_COLS = ["ticker", "expiration", "contractSymbol", "strike", "price", "bid", "midPrice", "score", "impliedVolatility"]
+
+
+def _bs_inputs(
+    df: pd.DataFrame, spot
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Extract Black-Scholes inputs once as contiguous float32 arrays (SoA):
+    S, K, T, sigma, is_call. sigma is NaN unless 0 < impliedVolatility < 5.
+    spot is a scalar or a per-row array.
+    """
+    K = df["strike"].to_numpy(dtype=np.float32, na_value=np.nan)
+    T = df["time_to_expiry_years"].to_numpy(dtype=np.float32, na_value=np.nan)
+    iv = df["impliedVolatility"].to_numpy(dtype=np.float32, na_value=0)
+    sigma = np.where((iv > 0) & (iv < 5), iv, np.float32("nan"))
+    S = np.full_like(K, spot)
+    is_call = (df["option_type"] == "call").to_numpy(dtype=bool)
+    return S, K, T, sigma, is_call
+
 
 def compute_scores(
     options_df: pd.DataFrame,
@@ -18,6 +38,7 @@ def compute_scores(
     r: float,
     sentiment_mean: float,
     sentiment_weight: float = 1.0,
+    groups: np.ndarray | None = None,
 ) -> pd.DataFrame:
     """
     Add theo_price, pricing_gap, pricing_gap_pct, liquidity_score, spread_penalty,
@@ -26,69 +47,139 @@ def compute_scores(
 
     sentiment_weight: 0-1. When 1.0 (default), alignment is sentiment-only: bearish
     -> favor puts (Buy), avoid calls (Avoid). When <1, mispricing can soften that.
+
+    To score several tickers in one call, pass spot as a per-row array and groups as
+    per-row labels (e.g. ticker codes): the tanh normalization is then done per group,
+    giving the same result as one call per ticker.
     """
     if options_df is None or options_df.empty:
         return pd.DataFrame()
 
-    df = options_df.copy()
-
-    # Validate sigma: use impliedVolatility only when 0 < sigma < 5
-    sigma = df["impliedVolatility"].fillna(0)
-    sigma = np.where((sigma > 0) & (sigma < 5), sigma, float("nan"))
-
-    # Theo price via BS
-    theo = np.full(len(df), float("nan"))
-    for i in range(len(df)):
-        S = spot
-        K = df["strike"].iloc[i]
-        T = df["time_to_expiry_years"].iloc[i]
-        sig = sigma.iloc[i] if hasattr(sigma, "iloc") else sigma[i]
-        opt_type = "call" if df["option_type"].iloc[i] == "call" else "put"
-        theo[i] = bs_price(S, K, T, r, sig, opt_type)
-    df["theo_price"] = theo
+    # Shallow copy: every column below is assigned whole, so the caller's frame is untouched
+    df = options_df.copy(deep=False)
+
+    # Theo price via BS (batched kernel over contiguous float32 columns)
+    S, K, T, sigma, is_call = _bs_inputs(df, spot)
+    theo = bs_batch(S, K, T, r, sigma, is_call, np.empty_like(K)).astype(np.float64)
+
+    # Pull each input column once as float64 with NaN -> 0, then work on arrays
+    mid = df["mid_price"].to_numpy(dtype=np.float64, na_value=0.0)
+    vol = df["volume"].to_numpy(dtype=np.float64, na_value=0.0)
+    oi = df["openInterest"].to_numpy(dtype=np.float64, na_value=0.0)
+    bid = df["bid"].to_numpy(dtype=np.float64, na_value=0.0)
+    ask = df["ask"].to_numpy(dtype=np.float64, na_value=0.0)
 
-    mid = df["mid_price"].fillna(0)
-    df["pricing_gap"] = mid - df["theo_price"]
-    df["pricing_gap_pct"] = df["pricing_gap"] / np.maximum(df["theo_price"], 0.01)
+    pricing_gap = mid - theo
+    pricing_gap_pct = pricing_gap / np.maximum(theo, 0.01)
 
-    vol = df["volume"].fillna(0)
-    oi = df["openInterest"].fillna(0)
-    df["liquidity_score"] = np.log1p(vol.astype(float) + oi.astype(float))
+    vol_oi = vol + oi
+    liquidity_score = np.log1p(vol_oi)
 
-    bid = df["bid"].fillna(0)
-    ask = df["ask"].fillna(0)
-    spread = np.where((bid > 0) & (ask > 0), ask - bid, float("nan"))
-    df["spread_penalty"] = np.clip(
-        spread / np.maximum(mid.astype(float), 0.01), 0, 5
-    )
-    df["spread_penalty"] = df["spread_penalty"].fillna(5)  # treat NaN spread as max penalty
+    spread = np.where((bid > 0) & (ask > 0), ask - bid, np.nan)
+    spread_penalty = np.clip(spread / np.maximum(mid, 0.01), 0, 5)
+    spread_penalty[np.isnan(spread_penalty)] = 5  # treat NaN spread as max penalty
 
     # alignment: sentiment only (default). Bearish -> favor puts (+1), disfavor calls (-1)
-    call_put_sign = np.where(df["option_type"] == "call", 1, -1)
+    call_put_sign = np.where(df["option_type"] == "call", np.int8(1), np.int8(-1))
     sentiment_sign = np.sign(sentiment_mean) if sentiment_mean != 0 else 0
-    df["alignment"] = sentiment_sign * call_put_sign
+    if np.isfinite(sentiment_sign):
+        alignment = call_put_sign * np.int8(sentiment_sign)  # -1/0/+1 as int8
+    else:
+        alignment = sentiment_sign * call_put_sign  # NaN sentiment propagates
 
     # opportunity_score_raw
-    abs_gap_pct = np.abs(df["pricing_gap_pct"])
-    liq_factor = 1 + 0.25 * df["liquidity_score"]
-    spread_factor = np.exp(-df["spread_penalty"])
-    df["opportunity_score_raw"] = (
-        df["alignment"].astype(float) * abs_gap_pct * liq_factor * spread_factor
-    )
+    raw = alignment.astype(float)
+    raw *= np.abs(pricing_gap_pct)
+    raw *= 1 + 0.25 * liquidity_score
+    raw *= np.exp(-spread_penalty)
 
     # Normalize to [-100, 100]: tanh scaling
-    raw = df["opportunity_score_raw"].values
-    if np.any(np.isfinite(raw)) and np.nanmax(np.abs(raw)) > 0:
+    if groups is not None:
+        opportunity_score = _group_tanh_scores(raw, groups)
+    elif np.any(np.isfinite(raw)) and np.nanmax(np.abs(raw)) > 0:
         scale = np.nanmax(np.abs(raw)) * 1.5
         scale = max(scale, 1e-6)
-        df["opportunity_score"] = np.clip(
-            np.tanh(raw / scale) * 100, -100, 100
-        )
+        opportunity_score = np.clip(np.tanh(raw / scale) * 100, -100, 100)
     else:
-        df["opportunity_score"] = 0.0
+        opportunity_score = 0.0
 
+    df["theo_price"] = theo
+    df["pricing_gap"] = pricing_gap
+    df["pricing_gap_pct"] = pricing_gap_pct
+    df["liquidity_score"] = liquidity_score
+    df["spread_penalty"] = spread_penalty
+    df["alignment"] = alignment
+    df["opportunity_score_raw"] = raw
+    df["opportunity_score"] = opportunity_score
     # risk_flag: spread_penalty > 1.0 OR (volume + openInterest) < 10
-    vol_oi = vol.astype(float) + oi.astype(float)
-    df["risk_flag"] = (df["spread_penalty"] > 1.0) | (vol_oi < 10)
+    df["risk_flag"] = (spread_penalty > 1.0) | (vol_oi < 10)
 
     return df
+
+
+def _group_tanh_scores(raw: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """Per-group version of the tanh normalization in compute_scores."""
+    by = pd.Series(np.abs(raw)).groupby(groups)
+    gmax = by.transform("max").to_numpy()
+    has_finite = pd.Series(np.isfinite(raw)).groupby(groups).transform("any").to_numpy(dtype=bool)
+    ok = has_finite & (gmax > 0)
+    with np.errstate(invalid="ignore"):
+        scale = np.maximum(gmax * 1.5, 1e-6)
+        scores = np.clip(np.tanh(raw / scale) * 100, -100, 100)
+    return np.where(ok, scores, 0.0)
+
+
+def top_abs_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k largest |scores|, ordered by |score| descending; NaN scores
+    only fill in after every real one (same rows as nlargest). O(N) partition
+    instead of a full sort.
+    """
+    abs_scores = np.abs(scores)
+    nan = np.isnan(abs_scores)
+    valid = np.flatnonzero(~nan)
+    if k <= 0:
+        return valid[:0]
+    if k < len(valid):
+        vals = abs_scores[valid]
+        kth = -np.partition(-vals, k - 1)[k - 1]
+        # ties at the cut go to the earliest rows, like nlargest(keep="first")
+        above = vals > kth
+        at_cut = np.flatnonzero(vals == kth)[: k - int(above.sum())]
+        valid = np.sort(np.concatenate([valid[above], valid[at_cut]]))
+    top = valid[np.argsort(-abs_scores[valid], kind="stable")]
+    if k > len(top):
+        top = np.concatenate([top, np.flatnonzero(nan)[: k - len(top)]])
+    return top
+
+
+def top_by_abs_score(df: pd.DataFrame, k: int, col: str = "opportunity_score") -> pd.DataFrame:
+    """Rows of df with the k largest |col|, ordered like df.assign(_abs=...).nlargest(k, "_abs")."""
+    return df.iloc[top_abs_indices(df[col].to_numpy(dtype=np.float64, na_value=np.nan), k)]
+
+
+def output_rows(ticker: str, top: pd.DataFrame) -> list[dict]:
+    """OUTPUT_COLS records for one ticker's selected options, built column-wise (missing columns -> "")."""
+    def col(name: str):
+        return top[name] if name in top.columns else ""
+
+    exp = top["expiration"] if "expiration" in top.columns else pd.Series("", index=top.index)
+    frag = pd.DataFrame({
+        "ticker": ticker,
+        "expiration": exp.map(_iso_or_str),
+        "contractSymbol": top["contractSymbol"].astype(str) if "contractSymbol" in top.columns else "",
+        "strike": col("strike"),
+        "price": col("lastPrice"),
+        "bid": col("bid"),
+        "midPrice": col("mid_price"),
+        "score": col("opportunity_score"),
+        "impliedVolatility": col("impliedVolatility"),
+    }, index=top.index)
+    return frag.to_dict("records")
+
+
+def _iso_or_str(value) -> str:
+    """Timestamps as isoformat, None as "", anything else via str()."""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return "" if value is None else str(value)
@@ -2,11 +2,11 @@
 Scrape diverse company headlines and append to newsapi_headlines.csv.
 
 Supports two sources:
-  - eventregistry: NewsAPI.ai / Event Registry (requires NEWS_API_KEY, pip install eventregistry)
+  - eventregistry: NewsAPI.ai / Event Registry (requires NEWS_API_KEY)
   - yahoo: Yahoo Finance via yfinance (no API key, works out of the box)
 
 Usage:
-  # Event Registry (NewsAPI.ai) - needs key + eventregistry
+  # Event Registry (NewsAPI.ai) - needs key
   $env:NEWS_API_KEY = "your_key"
   python scrape_newsapi_diverse.py
 
@@ -15,142 +15,91 @@ Usage:
 
   # Limit to first 50 companies (faster)
   python scrape_newsapi_diverse.py --yahoo --limit 50
+
+  # Reuse Yahoo results fetched in the last 4 hours (see --cache-ttl-hours)
+  python scrape_newsapi_diverse.py --yahoo --cache
+
+  # Append to newsapi_headlines.csv.gz instead (pandas / pyarrow readers accept it as-is)
+  python scrape_newsapi_diverse.py --yahoo --gzip
 """
 import csv
+import gzip
+import json
 import os
+import random
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 CACHE_PATH = Path(__file__).resolve().parent / "newsapi_headlines.csv"
+GZIP_PATH = CACHE_PATH.with_suffix(".csv.gz")
+# Per-ticker Yahoo responses, shared cache dir with market_data / news_sentiment
+YAHOO_CACHE_DIR = Path.home() / ".cache" / "scholes"
+
+# Tickers to scrape when using Yahoo live in tickers.txt next to this script
+TICKERS_PATH = Path(__file__).resolve().parent / "tickers.txt"
+
+
+@lru_cache(maxsize=1)
+def _load_tickers() -> list[str]:
+    """Yahoo tickers from tickers.txt, in file order, deduplicated; '#' starts a comment."""
+    text = TICKERS_PATH.read_text(encoding="utf-8")
+    return list(dict.fromkeys(tok for line in text.splitlines() for tok in line.split("#", 1)[0].split()))
+
+
+class _TokenBucket:
+    """Thread-safe token bucket: acquire() blocks until a request slot is free."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# Shared across fetch threads so --workers never pushes Yahoo past ~5 requests/sec
+_YAHOO_BUCKET = _TokenBucket(rate=5.0)
+_YAHOO_RETRIES = 4
+
+
+def _is_rate_limited(e: Exception) -> bool:
+    """True for yfinance's YFRateLimitError or any error reporting HTTP 429."""
+    msg = str(e)
+    return type(e).__name__ == "YFRateLimitError" or "429" in msg or "Too Many Requests" in msg
 
-# Tickers to scrape when using Yahoo - diverse companies across sectors
-YAHOO_TICKERS = [
-    # ETFs & mega tech
-    "SPY", "QQQ", "AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA",
-    # Tech
-    "ADBE", "CRM", "ORCL", "CSCO", "IBM", "INTC", "AMD", "QCOM", "AVGO", "TXN", "NFLX",
-    "PYPL", "SQ", "SPOT", "UBER", "ABNB", "ZM", "NOW", "WDAY", "SNOW", "DDOG", "CRWD",
-    "PANW", "FTNT", "ZS", "NET", "SHOP", "ETSY", "MELI", "SE", "DASH", "OKTA", "DOCU",
-    "TEAM", "TWLO", "ESTC", "PLTR", "COIN", "HOOD", "SOFI", "AFRM", "ROKU",
-    # Semiconductors
-    "TSM", "ASML", "MU", "WDC", "STX", "AMAT", "LRCX", "SNPS", "CDNS", "MRVL", "ON",
-    # China tech
-    "BABA", "JD", "BIDU", "PDD", "NIO", "XPEV", "LI",
-    # Healthcare / Pharma
-    "JNJ", "UNH", "PFE", "MRK", "LLY", "ABBV", "BMY", "AMGN", "GILD", "TMO", "ABT",
-    "DHR", "MRNA", "REGN", "VRTX", "BIIB", "AZN", "NVS", "SNY", "GSK", "MDT", "BSX",
-    "EW", "SYK", "ZBH", "ISRG", "DXCM", "BDX", "LH", "DGX", "CVS", "HCA", "ELV",
-    "IQV", "ILMN", "EXAS", "ALNY", "BMRN", "SRPT", "IDXX", "ZTS",
-    # Finance
-    "JPM", "BAC", "GS", "MS", "WFC", "C", "AXP", "BLK", "SCHW", "V", "MA", "FI",
-    "COF", "DFS", "BK", "BRK", "KKR", "BX", "APO", "CG", "CB", "TRV", "PGR", "MET", "PRU",
-    "AON", "MMC", "ICE", "CME", "SPGI", "MCO", "MSCI",
-    # Consumer / Retail
-    "WMT", "PG", "KO", "COST", "PEP", "MCD", "NKE", "HD", "TGT", "LOW", "TJX",
-    "SBUX", "CMG", "YUM", "DPZ", "LULU", "ROST", "DG", "DLTR",
-    # Auto / Transport
-    "F", "GM", "TM", "HMC", "RIVN", "LCID", "UBER", "LYFT",
-    # Travel / Leisure
-    "DIS", "BKNG", "EXPE", "MAR", "HLT", "RCL", "CCL", "LVS", "MGM", "WYNN",
-    # Energy
-    "XOM", "CVX", "COP", "SLB", "EOG", "MPC", "VLO", "OXY", "PXD", "DVN", "HAL", "BKR",
-    # Utilities
-    "NEE", "DUK", "SO", "D", "AEP", "EXC", "XEL", "SRE", "WEC",
-    # Industrials
-    "CAT", "BA", "UNP", "HON", "UPS", "FDX", "GE", "LMT", "RTX", "NOC", "GD",
-    "DE", "MMM", "EMR", "ROK", "PH", "ETN", "ITW", "CSX", "NSC", "WM", "RSG",
-    "XPO", "ODFL", "JBHT", "CHRW", "CARR", "TT", "JCI", "LHX", "TDG", "HII",
-    # Materials / Real Estate
-    "LIN", "SHW", "PLD", "AMT", "EQIX", "NEM", "FCX", "NUE", "STLD", "DOW", "DD",
-    "APD", "PPG", "ALB", "VMC", "MLM", "SPG", "WELL", "DLR", "CCI", "CBRE",
-    # Gaming / Media / Entertainment
-    "EA", "TTWO", "RBLX", "U", "ZG", "MTCH", "WBD", "PARA",
-    # Aerospace / Defense
-    "LMT", "RTX", "NOC", "GD", "HII", "LHX", "TDG", "HON", "TXT",
-    # Specialty retail / apparel
-    "ANF", "GPS", "AEO", "BBY", "ORLY", "AZO", "KMX", "CVNA", "DKS",
-    # Software / cloud (more)
-    "MDB", "ZM", "TWLO", "HUBS", "VEEV", "WK", "TYL", "FIS", "GDDY",
-    # Biotech / pharma (more)
-    "BIIB", "VRTX", "BHVN", "ALNY", "REGN", "EXEL", "INCY",
-    # Insurance
-    "ALL", "AFL", "CINF", "L", "AIG", "HIG", "AIZ", "WRB",
-    # Regional banks / diversified
-    "USB", "PNC", "TFC", "FITB", "KEY", "HBAN", "CFG", "RF",
-    # Food / Bev (more)
-    "K", "GIS", "CPB", "HSY", "KDP", "MNST", "STZ", "BF.B", "TAP", "DEO",
-    # Industrials (more)
-    "FAST", "GWW", "MSM", "SWK", "CMI", "PCAR", "DOV", "IEX", "PNR", "FTV",
-    # REITs / real estate (more)
-    "PSA", "EQIX", "AVB", "EQR", "UDR", "VTR", "O", "ARE",
-    # Clean energy / EV-related
-    "ENPH", "SEDG", "FSLR", "RUN", "PLUG", "BE", "CHPT", "BLDP",
-    # International
-    "SAP", "ASML", "SIEGY", "STM", "NVO",
-    # Telecom / media
-    "SONY", "PM", "MO", "T", "VZ", "CMCSA", "CHTR", "TMUS",
-    # Airlines
-    "DAL", "UAL", "LUV", "AAL", "ALK", "JBLU", "SAVE", "HA",
-    # Lodging / hospitality
-    "HGV", "HLT", "MAR", "WH", "CHH", "H",
-    # Construction / engineering
-    "PWR", "FLR", "MTZ", "APG",
-    # Chemicals (more)
-    "CE", "EMN", "FMC", "LYB", "WLK", "RPM", "MOS", "CF",
-    # Metals / mining (more)
-    "AA", "CLF", "X", "SCCO", "TECK", "RGLD", "FNV", "GOLD",
-    "IFF", "CE", "EMN", "RPM", "CF", "MOS",
-    # Packaging / containers
-    "IP", "PKG", "WRK", "SEE", "AMCR",
-    # Staffing / HR
-    "RHI", "KFRC", "KFY", "PAYX",
-    # Asset mgmt / brokerages (more)
-    "AMG", "IVZ", "TROW", "BEN", "LAZ", "PJT", "STEP",
-    # Consumer durables
-    "WHR", "NVR", "LEN", "DHI", "PHM", "TOL", "KBH", "MTH",
-    # Restaurants (more)
-    "WING", "SHAK", "CAVA", "BJRI", "BLMN",
-    # Casinos / gaming (more)
-    "CZR", "PENN", "BYD",
-    # Pipelines / midstream
-    "KMI", "EPD", "MPLX", "WMB", "OKE", "PAA", "ET",
-    # Oilfield / energy services (more)
-    "NOV", "HP", "PTEN", "RIG", "VAL", "FANG",
-    # Utilities (more)
-    "ED", "AEE", "ES", "PEG", "EIX", "FE", "CNP", "AEP",
-    # Biotech / pharma (more)
-    "GILD", "AMGN", "BMRN", "BPMC", "RARE", "ALNY",
-    "NTRA", "EXAS", "TECH", "HOLX", "MTD", "WAT", "A",
-    # Medical / healthcare services (more)
-    "HUM", "CI", "CNC", "MOH", "MCK", "ABC", "CAH",
-    # ETFs
-    "IWM", "DIA", "XLF", "XLK", "XLE", "XLV", "XLI", "XLY",
-    # Mid-cap tech (more)
-    "GEN", "BILL", "SMAR", "DOMO", "DOCN", "CFLT", "PATH",
-    # Payment / fintech (more)
-    "GPN", "FISV", "WEX", "FLT", "EVO",
-    # International (more)
-    "BHP", "RIO", "GLNCY", "SAN", "DB", "UBS",
-    "BP", "SHEL", "TTE", "SNP", "PTR", "CEO", "NSANY",
-    # More diverse: mid/small cap, specialty
-    "AKAM", "FFIV", "VRSN", "ANSS", "CDNS", "ANET", "CIEN", "JNPR",
-    "HPE", "NTAP", "WDC", "STX", "MPWR", "SWKS", "QRVO", "MCHP",
-    "DXC", "EPAM", "IT", "CTSH", "ACN", "INFY", "WIT", "HCL",
-    "ULTA", "POOL", "RH", "WSM", "ETH", "HBI", "VFC",
-    "CL", "EL", "CPB", "SJM", "LW", "SMPL", "LANC", "SYY",
-    "LHX", "TXT", "LDOS", "HII", "NOC", "GD", "LMT", "RTX",
-    "SW", "RBC", "SNA", "TTC", "XYL", "WSO", "ITW", "GNRC",
-    "ROP", "OTIS", "CARR", "TT", "IR", "JCI", "WAB", "HUBB",
-    "HAS", "MAT", "F", "GM", "RIVN", "LCID", "AN", "KMX",
-    "LAD", "PAG", "SAH", "ABG", "CARG", "CVNA",
-    "TDG", "WWD", "HWM", "ATI", "CENX", "KALU", "CMC",
-    "VST", "NRG", "CWEN", "ORA", "BEPC", "BEP", "NEP",
-    "SFRGY", "BG", "ADM", "TSN",
-    "DG", "DLTR", "SIG", "BOOT", "BKE",
-]
+
+def _get_news(t, ticker: str, count: int) -> list:
+    """t.get_news behind the shared rate limiter, retrying 429s with exponential backoff."""
+    for attempt in range(_YAHOO_RETRIES + 1):
+        _YAHOO_BUCKET.acquire()
+        try:
+            return t.get_news(count=count, tab="news")
+        except Exception as e:
+            if attempt == _YAHOO_RETRIES or not _is_rate_limited(e):
+                raise
+            backoff = min(60.0, 2 ** attempt + random.random())
+            print(f"  Yahoo rate limit (429) for {ticker}, retry {attempt + 1}/{_YAHOO_RETRIES} "
+                  f"in {backoff:.1f}s", file=sys.stderr)
+            time.sleep(backoff)
 
 
 def _fetch_yahoo(ticker: str, n: int = 50) -> list[dict]:
@@ -158,7 +107,7 @@ def _fetch_yahoo(ticker: str, n: int = 50) -> list[dict]:
     try:
         import yfinance as yf
         t = yf.Ticker(ticker)
-        raw = t.get_news(count=min(n, 50), tab="news")
+        raw = _get_news(t, ticker, min(n, 50))
         if not raw:
             return []
         out = []
@@ -188,20 +137,67 @@ def _fetch_yahoo(ticker: str, n: int = 50) -> list[dict]:
         return []
 
 
-def _save_to_csv(headlines: list[dict], query: str) -> None:
+CSV_HEADER = ["query", "title", "source", "publishedAt", "url", "fetched_at"]
+
+
+def _fetch_yahoo_cached(ticker: str, n: int, max_age_hours: float, use_cache: bool) -> list[dict]:
+    """
+    _fetch_yahoo behind a per-ticker JSON file cache. The cache is read only when
+    use_cache and younger than max_age_hours; fresh non-empty results are always saved.
+    """
+    path = YAHOO_CACHE_DIR / f"yahoo_news_{ticker}_{n}.json"
+    if use_cache:
+        try:
+            if time.time() - path.stat().st_mtime < max_age_hours * 3600:
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except (OSError, ValueError):
+            pass
+    out = _fetch_yahoo(ticker, n=n)
+    if out:
+        try:
+            YAHOO_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(out, f)
+        except OSError:
+            pass
+    return out
+
+
+def _load_seen(path: Path) -> set[tuple[str, str]]:
+    """(query, url) pairs already in a headlines CSV (plain or .gz); empty set if missing."""
+    if not path.exists():
+        return set()
+    opener = gzip.open if path.suffix == ".gz" else open
+    try:
+        with opener(path, "rt", newline="", encoding="utf-8") as f:
+            r = csv.reader(f)
+            header = next(r, None)
+            if not header or "query" not in header or "url" not in header:
+                return set()
+            qi, ui = header.index("query"), header.index("url")
+            return {(row[qi], row[ui]) for row in r if len(row) > max(qi, ui) and row[ui]}
+    except (OSError, EOFError, csv.Error) as e:
+        print(f"  Could not read existing headlines from {path.name}: {e}", file=sys.stderr)
+        return set()
+
+
+# Rows buffered across tickers before one writerows call
+CSV_FLUSH_ROWS = 500
+
+
+def _csv_rows(headlines: list[dict], query: str) -> list[list[str]]:
+    """CSV_HEADER rows for one ticker's headlines, stamped with the current fetched_at."""
     if not headlines:
-        return
-    write_header = not CACHE_PATH.exists()
+        return []
     fetched_at = datetime.now(timezone.utc).isoformat()
-    with open(CACHE_PATH, "a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        if write_header:
-            w.writerow(["query", "title", "source", "publishedAt", "url", "fetched_at"])
-        for h in headlines:
-            w.writerow([
-                query, h.get("title", ""), h.get("source", ""),
-                h.get("publishedAt", ""), h.get("url", ""), fetched_at,
-            ])
+    return [
+        [
+            query, h.get("title", ""), h.get("source", ""),
+            h.get("publishedAt", ""), h.get("url", ""), fetched_at,
+        ]
+        for h in headlines
+    ]
 
 
 def main() -> int:
@@ -212,28 +208,80 @@ def main() -> int:
     parser.add_argument("--yahoo", action="store_true",
                         help="Use Yahoo Finance (no API key, works without eventregistry)")
     parser.add_argument("--limit", type=int, default=0, help="Limit to first N tickers/queries")
-    parser.add_argument("--no-cache", action="store_true", help="Force fresh fetch (Event Registry only)")
-    parser.add_argument("--cache", action="store_true", help="Use cache when available (Event Registry only)")
+    parser.add_argument("--workers", type=int, default=16,
+                        help="Concurrent Yahoo fetches (default: 16)")
+    parser.add_argument("--no-cache", action="store_true", help="Force fresh fetch")
+    parser.add_argument("--cache", action="store_true", help="Use cache when available")
+    parser.add_argument("--cache-ttl-hours", type=float, default=4.0,
+                        help="Max age of cached Yahoo results used with --cache (default: 4)")
+    parser.add_argument("--gzip", action="store_true",
+                        help="Append Yahoo headlines to newsapi_headlines.csv.gz (gzip level 1)")
     args = parser.parse_args()
 
     if args.yahoo:
-        tickers = YAHOO_TICKERS
+        tickers = _load_tickers()
         if args.limit > 0:
             tickers = tickers[: args.limit]
         print(f"Fetching Yahoo headlines for {len(tickers)} tickers...")
-        print("Output: newsapi_headlines.csv\n")
+        out_path = GZIP_PATH if args.gzip else CACHE_PATH
+        print(f"Output: {out_path.name}\n")
         total = 0
-        for i, ticker in enumerate(tickers, 1):
-            print(f"[{i}/{len(tickers)}] {ticker}")
-            headlines = _fetch_yahoo(ticker, n=50)
-            if headlines:
-                _save_to_csv(headlines, ticker)
-                total += len(headlines)
-                print(f"  → {len(headlines)} headlines")
-            else:
-                print("  → no results")
-        print(f"\nDone. Total: {total} headlines across {len(tickers)} tickers.")
-        return 0 if total > 0 else 1
+        skipped = 0
+        write_header = not out_path.exists() or out_path.stat().st_size == 0
+        # Headlines already saved by earlier runs are not appended again
+        seen = _load_seen(out_path)
+        # One append handle for the whole run instead of an open per ticker.
+        # With --gzip each run appends one gzip member; readers see a single stream.
+        if args.gzip:
+            out = gzip.open(out_path, "at", newline="", encoding="utf-8", compresslevel=1)
+        else:
+            out = open(out_path, "a", newline="", encoding="utf-8", buffering=1 << 20)
+        # Fetch on a thread pool; results come back in ticker order and are
+        # written from this thread only
+        with out as f, ThreadPoolExecutor(max_workers=max(1, args.workers)) as ex:
+            w = csv.writer(f)
+            if write_header:
+                w.writerow(CSV_HEADER)
+            pending: list[list[str]] = []
+            use_cache = args.cache and not args.no_cache
+            results = ex.map(
+                lambda t: _fetch_yahoo_cached(t, 50, args.cache_ttl_hours, use_cache), tickers
+            )
+            # Rows still buffered are written even if the run is interrupted
+            try:
+                for i, (ticker, headlines) in enumerate(zip(tickers, results), 1):
+                    print(f"[{i}/{len(tickers)}] {ticker}")
+                    if not headlines:
+                        print("  → no results")
+                        continue
+                    new = []
+                    for h in headlines:
+                        url = h.get("url", "")
+                        if url:
+                            if (ticker, url) in seen:
+                                continue
+                            seen.add((ticker, url))
+                        new.append(h)
+                    pending.extend(_csv_rows(new, ticker))
+                    if len(pending) >= CSV_FLUSH_ROWS:
+                        w.writerows(pending)
+                        pending.clear()
+                    total += len(new)
+                    skipped += len(headlines) - len(new)
+                    if len(new) < len(headlines):
+                        print(f"  → {len(new)} headlines ({len(headlines) - len(new)} already saved)")
+                    else:
+                        print(f"  → {len(new)} headlines")
+            except BaseException:
+                # Ctrl-C: drop queued tickers instead of fetching them just to discard
+                # the results; only fetches already in flight finish
+                ex.shutdown(wait=False, cancel_futures=True)
+                raise
+            finally:
+                w.writerows(pending)
+        print(f"\nDone. Total: {total} new headlines across {len(tickers)} tickers"
+              f" ({skipped} already saved).")
+        return 0 if total + skipped > 0 else 1
 
     # Event Registry path
     api_key = os.environ.get("NEWS_API_KEY", "").strip()
@@ -246,8 +294,8 @@ def main() -> int:
     try:
         from newsapi_client import SECTOR_QUERIES_400, fetch_headlines
     except ImportError as e:
-        print("Error: eventregistry not installed.", file=sys.stderr)
-        print("Run: pip install eventregistry", file=sys.stderr)
+        print(f"Error: could not import newsapi_client: {e}", file=sys.stderr)
+        print("Run: pip install -r requirements.txt", file=sys.stderr)
         print("Or use --yahoo for Yahoo Finance.", file=sys.stderr)
         return 1
 
@@ -0,0 +1,27 @@
+"""bs_batch falls back to the NumPy pricer when the Numba kernel is unusable."""
+import numpy as np
+
+import bs_numba
+from bs import bs_price_vec
+
+
+def _inputs():
+    S = np.full(4, 100.0, dtype=np.float32)
+    K = np.array([90, 100, 110, 120], dtype=np.float32)
+    T = np.full(4, 0.5, dtype=np.float32)
+    sigma = np.full(4, 0.25, dtype=np.float32)
+    is_call = np.array([True, False, True, False])
+    return S, K, T, sigma, is_call
+
+
+def test_kernel_error_falls_back_to_numpy(monkeypatch):
+    def broken(*args):
+        raise RuntimeError("no threading layer could be loaded")
+
+    monkeypatch.setattr(bs_numba, "NUMBA_AVAILABLE", True)
+    monkeypatch.setattr(bs_numba, "_kernel_checked", False)
+    monkeypatch.setattr(bs_numba, "_bs_batch", broken)
+    S, K, T, sigma, is_call = _inputs()
+    out = bs_numba.bs_batch(S, K, T, 0.045, sigma, is_call, np.empty_like(K))
+    assert not bs_numba.NUMBA_AVAILABLE
+    np.testing.assert_allclose(out, bs_price_vec(S, K, T, 0.045, sigma, is_call))
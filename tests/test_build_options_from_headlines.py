@@ -0,0 +1,19 @@
+"""Ticker extraction from the headlines CSV query column."""
+import sys
+
+import pytest
+
+import build_options_from_headlines as bo
+
+CSV = "query,title\nApple AAPL,a\n,b\nTesla TSLA OR MSFT,c\n"
+
+
+@pytest.mark.parametrize("hide_pyarrow", [False, True])
+def test_blank_query_is_skipped(tmp_path, monkeypatch, hide_pyarrow):
+    if hide_pyarrow:
+        # None in sys.modules makes `import pyarrow` raise ImportError -> pandas fallback
+        monkeypatch.setitem(sys.modules, "pyarrow", None)
+        monkeypatch.setitem(sys.modules, "pyarrow.csv", None)
+    path = tmp_path / "headlines.csv"
+    path.write_text(CSV, encoding="utf-8")
+    assert bo.get_unique_tickers_from_headlines(str(path)) == ["AAPL", "MSFT", "TSLA"]
@@ -0,0 +1,59 @@
+"""Headline cache lookups through the SQLite index over the CSV."""
+import csv
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import newsapi_client
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """Point the CSV cache and its index at a temp dir; yields the CSV path."""
+    monkeypatch.setattr(newsapi_client, "CACHE_PATH", tmp_path / "newsapi_headlines.csv")
+    monkeypatch.setattr(newsapi_client, "CACHE_DB_PATH", tmp_path / "newsapi_headlines.db")
+    monkeypatch.setattr(newsapi_client, "_cache_db", None)
+    yield newsapi_client.CACHE_PATH
+    if newsapi_client._cache_db is not None:
+        newsapi_client._cache_db.close()
+
+
+def _write_rows(path, rows):
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        if f.tell() == 0:
+            w.writerow(newsapi_client.CACHE_COLUMNS)
+        w.writerows(rows)
+
+
+def test_blank_fetched_at_counts_as_fresh(cache):
+    now = datetime.now(timezone.utc).isoformat()
+    rows = []
+    for q in ("Apple AAPL", "Tesla TSLA"):
+        for i in range(100):
+            rows.append([q, f"{q} {i}", "src", "", f"https://x/{q}/{i}", "" if i % 50 == 0 else now])
+    _write_rows(cache, rows)
+    for q in ("Apple AAPL", "Tesla TSLA"):
+        got = newsapi_client.load_headlines_from_csv(q, 100)
+        assert [h["url"] for h in got] == [f"https://x/{q}/{i}" for i in range(100)]
+
+
+def test_stale_and_unparseable_excluded_blank_kept(cache):
+    old = (datetime.now(timezone.utc) - timedelta(hours=48)).isoformat()
+    now = datetime.now(timezone.utc).isoformat()
+    _write_rows(cache, [
+        ["Q", "stale", "s", "", "u1", old],
+        ["Q", "fresh", "s", "", "u2", now],
+        ["Q", "blank", "s", "", "u3", ""],
+        ["Q", "garbled", "s", "", "u4", "not a date"],
+        ["Q", "naive", "s", "", "u5", now[:19]],
+    ])
+    got = newsapi_client.load_headlines_from_csv("Q", 10, max_age_hours=24)
+    assert [h["title"] for h in got] == ["fresh", "blank"]
+
+
+def test_rows_appended_after_first_lookup_are_indexed(cache):
+    _write_rows(cache, [["Q", "a", "s", "", "u1", ""]])
+    assert len(newsapi_client.load_headlines_from_csv("Q", 10)) == 1
+    _write_rows(cache, [["Q", "b", "s", "", "u2", ""], ["Q", "a2", "s", "", "u1", ""]])
+    assert [h["title"] for h in newsapi_client.load_headlines_from_csv("Q", 10)] == ["b", "a2"]
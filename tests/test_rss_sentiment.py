@@ -0,0 +1,63 @@
+"""Ticker sentiment lookups against the tracked rss_sentiment.db."""
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+import rss_sentiment
+
+TRACKED_DB = Path(__file__).resolve().parent.parent / "rss_sentiment.db"
+ALL_TIME = 24 * 365 * 50  # hours; covers every item in the tracked DB
+
+
+@pytest.fixture
+def legacy_db(tmp_path, monkeypatch):
+    """Copy of the tracked DB as committed (written before item_tickers existed)."""
+    db = tmp_path / "rss_sentiment.db"
+    shutil.copy(TRACKED_DB, db)
+    monkeypatch.setattr(rss_sentiment, "DB_PATH", str(db))
+    return db
+
+
+def test_tracked_db_predates_item_tickers(legacy_db):
+    with sqlite3.connect(legacy_db) as conn:
+        assert not rss_sentiment._has_item_tickers(conn)
+
+
+def test_legacy_db_lookups(legacy_db):
+    assert rss_sentiment.get_ticker_sentiment("HIMS", hours=ALL_TIME) == -0.2632
+    assert rss_sentiment.get_ticker_sentiment("hims", hours=ALL_TIME) == -0.2632
+    assert rss_sentiment.get_ticker_sentiments(["HIMS", "ZZZZ"], hours=ALL_TIME) == {"HIMS": -0.2632}
+
+
+def test_migrated_db_matches_legacy(legacy_db):
+    conn = rss_sentiment.get_connection()
+    try:
+        legacy = rss_sentiment.per_ticker_sentiment(conn, ALL_TIME)
+        rss_sentiment.init_db(conn)
+        assert rss_sentiment._has_item_tickers(conn)
+        assert rss_sentiment.per_ticker_sentiment(conn, ALL_TIME) == legacy
+    finally:
+        conn.close()
+    assert rss_sentiment.get_ticker_sentiment("HIMS", hours=ALL_TIME) == -0.2632
+    assert rss_sentiment.get_ticker_sentiments(["HIMS"], hours=ALL_TIME) == {"HIMS": -0.2632}
+
+
+def test_untitled_entries_are_stored_separately(tmp_path, monkeypatch):
+    import feedparser
+
+    rss = """<?xml version="1.0"?><rss version="2.0"><channel><title>Feed</title>
+        <item><link>https://x/1</link><description>$AAPL beats</description></item>
+        <item><link>https://x/2</link><description>$TSLA misses</description></item>
+        <item><description>$MSFT surges</description></item>
+        <item><title>Titled</title><description>$NVDA rally</description></item>
+    </channel></rss>"""
+    monkeypatch.setattr(rss_sentiment, "DB_PATH", str(tmp_path / "rss.db"))
+    monkeypatch.setattr(rss_sentiment, "fetch_rss", lambda url, **kw: feedparser.parse(rss))
+    rss_sentiment.run_pipeline(["https://feed"])
+    rss_sentiment.run_pipeline(["https://feed"])  # re-fetch stores nothing new
+    with sqlite3.connect(tmp_path / "rss.db") as conn:
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 4
+        tickers = {t for (t,) in conn.execute("SELECT ticker FROM item_tickers")}
+    assert tickers == {"AAPL", "TSLA", "MSFT", "NVDA"}
@@ -11,10 +11,12 @@ import csv
 import logging
 from datetime import datetime, timezone
 import re
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 import pandas as pd
 
-from market_data import get_spot, get_options_chain
+from market_data import get_spot, get_spots, get_options_chain
 from scoring import compute_scores
 
 logging.basicConfig(
@@ -24,12 +26,54 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# OCC symbol put marker: 6-digit date, then P, then the strike
+_PUT_RE = re.compile(r"\d{6}P\d", re.IGNORECASE)
+
+
+def _years_to_expiry(exp_str, now: datetime) -> float:
+    """Years from now to an ISO expiration (date-only means 00:00 UTC); 0.01 if unparseable."""
+    try:
+        s = str(exp_str).replace("Z", "+00:00")
+        if "T" in s:
+            dt = datetime.fromisoformat(s)
+        else:
+            dt = datetime.strptime(s[:10], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        delta = (dt - now).total_seconds()
+        return max(delta / (365 * 24 * 3600), 1e-6)
+    except Exception:
+        return 0.01
+
+
+def _safe_spot(ticker: str) -> float:
+    """get_spot that logs and returns NaN instead of raising."""
+    try:
+        return get_spot(ticker)
+    except Exception as e:
+        logger.warning("Spot failed for %s: %s", ticker, e)
+        return float("nan")
+
+
+def _fetch_spots(tickers: list[str], workers: int) -> dict[str, float]:
+    """One batched get_spots call, then individual lookups (threaded) for any it missed."""
+    try:
+        spots = get_spots(tickers)
+    except Exception as e:
+        logger.warning("Batched spot fetch failed: %s", e)
+        spots = {}
+    missing = [t for t in tickers if pd.isna(spots.get(t, float("nan")))]
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+            spots.update(zip(missing, ex.map(_safe_spot, missing)))
+    return spots
+
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="Recompute scores in output_multi_ticker.csv")
     parser.add_argument("--input", default="output_multi_ticker.csv", help="Input CSV path")
     parser.add_argument("--output", default="", help="Output CSV path (default: overwrite input)")
     parser.add_argument("--r", type=float, default=0.045, help="Risk-free rate")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="Threads for per-ticker spot lookups the batch call missed (default: 8)")
     args = parser.parse_args()
     out_path = args.output or args.input
 
@@ -39,29 +83,14 @@ def main() -> int:
         return 1
 
     # Infer option_type from contractSymbol (e.g. AAPL260209C00210000 = call, AAPL260209P00210000 = put)
-    def opt_type(sym: str) -> str:
-        s = str(sym).upper()
-        if re.search(r"\d{6}P\d", s):
-            return "put"
-        return "call"
-
-    df["option_type"] = df["contractSymbol"].astype(str).apply(opt_type)
+    is_put = df["contractSymbol"].astype(str).str.contains(_PUT_RE, na=False)
+    df["option_type"] = np.where(is_put, "put", "call")
 
-    # Parse expiration -> time_to_expiry_years
+    # Parse expiration -> time_to_expiry_years, once per distinct expiration
     now = datetime.now(timezone.utc)
-    def parse_exp(exp_str):
-        try:
-            s = str(exp_str).replace("Z", "+00:00")
-            if "T" in s:
-                dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
-            else:
-                dt = datetime.strptime(s[:10], "%Y-%m-%d").replace(tzinfo=timezone.utc)
-            delta = (dt - now).total_seconds()
-            return max(delta / (365 * 24 * 3600), 1e-6)
-        except Exception:
-            return 0.01
-
-    df["time_to_expiry_years"] = df["expiration"].apply(parse_exp)
+    codes, uniques = pd.factorize(df["expiration"], use_na_sentinel=False)
+    years = np.array([_years_to_expiry(e, now) for e in uniques], dtype=float)
+    df["time_to_expiry_years"] = years[codes]
 
     # Estimate ask from bid/mid, use 0 for volume/OI
     mid = pd.to_numeric(df["midPrice"], errors="coerce").fillna(0)
@@ -72,45 +101,50 @@ def main() -> int:
     df["mid_price"] = mid
     df["lastPrice"] = df.get("price", mid)
 
-    # Group by ticker, fetch spot, run scoring
-    tickers = df["ticker"].unique().tolist()
+    # Scoring inputs for every row, coerced once
+    opts_all = df[["ticker", "expiration", "option_type", "contractSymbol", "strike",
+                   "lastPrice", "bid", "ask", "volume", "openInterest", "impliedVolatility",
+                   "mid_price", "time_to_expiry_years"]].assign(
+        strike=pd.to_numeric(df["strike"], errors="coerce"),
+        impliedVolatility=pd.to_numeric(df["impliedVolatility"], errors="coerce").fillna(0.2),
+    )
+
+    # Group by ticker in one pass: row positions per ticker, in first-seen order
+    codes, uniques = pd.factorize(df["ticker"])
+    tickers = uniques.tolist()
+    order = np.argsort(codes, kind="stable")
+    order = order[codes[order] >= 0]
+    counts = np.bincount(codes[order], minlength=len(tickers))
     logger.info("Updating scores for %d rows, %d tickers", len(df), len(tickers))
 
-    scored_rows = []
-    for ticker in tickers:
-        sub = df[df["ticker"] == ticker].copy()
-        if sub.empty:
-            continue
-        try:
-            spot = get_spot(ticker)
-            if pd.isna(spot) or spot <= 0:
-                logger.warning("No spot for %s, keeping old scores", ticker)
-                scored_rows.append(sub)
-                continue
-        except Exception as e:
-            logger.warning("Spot failed for %s: %s", ticker, e)
-            scored_rows.append(sub)
-            continue
-
-        # Build options-like df for scoring
-        opts = sub.rename(columns={"impliedVolatility": "impliedVolatility"}).copy()
-        opts = opts[["ticker", "expiration", "option_type", "contractSymbol", "strike",
-                    "lastPrice", "bid", "ask", "volume", "openInterest", "impliedVolatility",
-                    "mid_price", "time_to_expiry_years"]].copy()
-        opts["strike"] = pd.to_numeric(opts["strike"], errors="coerce")
-        opts["impliedVolatility"] = pd.to_numeric(opts["impliedVolatility"], errors="coerce").fillna(0.2)
-
-        scored = compute_scores(opts, float(spot), args.r, sentiment_mean=0.0)
-        if scored.empty or "opportunity_score" not in scored.columns:
-            scored_rows.append(sub)
-            continue
-
-        sub["score"] = scored["opportunity_score"].values
-        sub["score"] = sub["score"].round(4)
-        scored_rows.append(sub)
-        logger.info("%s: updated %d rows", ticker, len(sub))
-
-    out = pd.concat(scored_rows, ignore_index=True)
+    # Resolve every spot up front so scoring is a single call
+    spots = _fetch_spots([t for t in tickers if isinstance(t, str)], args.workers)
+    ticker_spot = np.array([spots.get(t, float("nan")) for t in tickers], dtype=float)
+    has_spot = ticker_spot > 0  # False for NaN too
+    for ticker in np.asarray(tickers, dtype=object)[~has_spot]:
+        logger.warning("No spot for %s, keeping old scores", ticker)
+
+    # Scores are written back by row position; unscored tickers keep their old values
+    scores = (
+        df["score"].to_numpy(dtype=float, copy=True)
+        if "score" in df.columns
+        else np.full(len(df), np.nan)
+    )
+    # One compute_scores call over every ticker with a spot; groups keeps the
+    # score normalization per ticker
+    rows = order[has_spot[codes[order]]]
+    if len(rows):
+        row_codes = codes[rows]
+        scored = compute_scores(
+            opts_all.iloc[rows], ticker_spot[row_codes], args.r, sentiment_mean=0.0, groups=row_codes
+        )
+        scores[rows] = np.round(scored["opportunity_score"].to_numpy(dtype=float), 4)
+        for ticker, n in zip(np.asarray(tickers, dtype=object)[has_spot], counts[has_spot]):
+            logger.info("%s: updated %d rows", ticker, n)
+
+    # Rows grouped by ticker (first-seen order), as before
+    out = df.iloc[order].reset_index(drop=True)
+    out["score"] = scores[order]
     out_cols = ["ticker", "expiration", "contractSymbol", "strike", "price", "bid", "midPrice", "score", "impliedVolatility"]
     out[out_cols].to_csv(out_path, index=False)
     logger.info("Wrote %s", out_path)